@@ -0,0 +1,136 @@
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from metrics import admission_rejected, admission_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when an analysis is shed; carries the HTTP status and a Retry-After hint in seconds"""
+
+    def __init__(self, message, status_code=503, retry_after=1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds the analyses a worker process runs at once and the requests waiting for a slot
+
+    Admitted analyses run on a thread pool of max_in_flight threads, so the
+    request thread only waits on the result and gives up at the deadline
+    while the pool keeps the CPU busy. A request that finds every slot taken
+    waits up to wait_timeout seconds if fewer than max_waiting requests are
+    already waiting; otherwise it is turned away immediately with 429. A
+    slot is freed only when the analysis itself finishes, even if its
+    request has stopped waiting, so shed requests never add CPU load.
+
+    The pool is created lazily and again after a fork, so the controller is
+    safe to create at import time under gunicorn.
+    """
+
+    def __init__(self, max_in_flight=2, max_waiting=4, wait_timeout=5.0, deadline=60.0):
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.deadline = deadline
+        self.in_flight = 0
+        self.waiting = 0
+        # Moving average of analysis durations, for Retry-After estimates
+        self._average_seconds = 1.0
+        self._condition = threading.Condition()
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self):
+        with self._condition:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="analysis")
+                self._executor_pid = os.getpid()
+                self.in_flight = self.waiting = 0
+            return self._executor
+
+    def retry_after(self):
+        """Seconds a rejected client should wait: the time to work through the current backlog"""
+        with self._condition:
+            backlog = self.in_flight + self.waiting
+            seconds = self._average_seconds * max(backlog, 1) / max(self.max_in_flight, 1)
+        return min(max(math.ceil(seconds), 1), 60)
+
+    def _reject(self, reason, status_code, message):
+        admission_rejected.inc(reason=reason)
+        logger.warning(f"Shedding analysis request ({reason}): {self.in_flight} in flight, {self.waiting} waiting")
+        return Overloaded(message, status_code, self.retry_after())
+
+    def _acquire(self):
+        with self._condition:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                admission_wait_seconds.observe(0)
+                return
+            if self.waiting >= self.max_waiting:
+                raise self._reject('queue_full', 429, 'Too many resumes are being analyzed; please retry shortly')
+
+            started = time.monotonic()
+            self.waiting += 1
+            try:
+                admitted = self._condition.wait_for(lambda: self.in_flight < self.max_in_flight, self.wait_timeout)
+                if admitted:
+                    self.in_flight += 1
+            finally:
+                self.waiting -= 1
+            admission_wait_seconds.observe(time.monotonic() - started)
+        if not admitted:
+            raise self._reject('queue_timeout', 503, 'The server is busy; please retry shortly')
+
+    def _release(self, seconds):
+        with self._condition:
+            self.in_flight -= 1
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * seconds
+            self._condition.notify()
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the analysis pool once admitted
+
+        The call runs in a copy of the caller's context, so stage timings
+        still reach the request's Server-Timing header. Since it may outlive
+        the request, its arguments must not be tied to the request (e.g. an
+        upload stream the framework closes when the request ends).
+
+        Returns:
+            The result of fn
+
+        Raises:
+            Overloaded: If the request is shed or the result isn't ready by the deadline
+        """
+        executor = self._get_executor()
+        self._acquire()
+        started = time.monotonic()
+        try:
+            future = executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        except Exception:
+            self._release(0)
+            raise
+        future.add_done_callback(lambda f: self._release(time.monotonic() - started))
+        try:
+            return future.result(timeout=self.deadline)
+        except FutureTimeoutError:
+            # The analysis carries on and caches its result, so a retry is usually cheap
+            raise self._reject('deadline', 503, 'The analysis is taking longer than expected; please retry shortly')
+
+    def stats(self):
+        with self._condition:
+            return {
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'max_in_flight': self.max_in_flight,
+                'max_waiting': self.max_waiting
+            }
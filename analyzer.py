@@ -1,72 +1,137 @@
 import re
 import logging
-import json
 import os
 
+from sections import segment_sections
+from skill_matcher import KeywordMatcher
+from taxonomy import registry as taxonomy_registry
+
 logger = logging.getLogger(__name__)
 
 # Load skills data
 SKILLS_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'data', 'skills.json')
 
+def _default_skills_data():
+    """Default skills categorization used when skills.json doesn't exist"""
+    return {
+        "technical_skills": [
+            "python", "java", "javascript", "html", "css", "react", "angular", "vue", 
+            "node.js", "express", "flask", "django", "spring", "hibernate", "sql", 
+            "mysql", "postgresql", "mongodb", "redis", "aws", "azure", "gcp", 
+            "docker", "kubernetes", "jenkins", "git", "jira", "agile", "scrum",
+            "c++", "c#", "php", "ruby", "swift", "kotlin", "rust", "golang", "scala",
+            "machine learning", "deep learning", "artificial intelligence", "data science",
+            "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "hadoop", "spark",
+            "tableau", "power bi", "excel", "word", "powerpoint", "photoshop", "illustrator",
+            "figma", "sketch", "adobe xd", "ui/ux", "seo", "digital marketing"
+        ],
+        "soft_skills": [
+            "communication", "teamwork", "problem solving", "critical thinking", 
+            "creativity", "leadership", "time management", "adaptability", "flexibility",
+            "organization", "planning", "decision making", "conflict resolution",
+            "attention to detail", "interpersonal skills", "emotional intelligence",
+            "negotiation", "persuasion", "presentation", "public speaking", "writing",
+            "customer service", "project management", "prioritization", "self-motivated",
+            "analytical", "logical", "innovative", "patient", "reliable", "responsible"
+        ],
+        "certifications": [
+            "aws certified", "microsoft certified", "google certified", "comptia", 
+            "cisco certified", "pmp", "six sigma", "itil", "scrum master", "agile certified",
+            "cpa", "cfa", "ceh", "cissp", "ccna", "ccnp", "mcsa", "mcse", "rhce", "salesforce"
+        ],
+        "languages": [
+            "english", "spanish", "french", "german", "italian", "portuguese", "russian",
+            "chinese", "japanese", "korean", "arabic", "hindi", "dutch", "swedish", "norwegian"
+        ]
+    }
+
+
+def _fallback_skills_data():
+    """Empty categorization used when skills.json can't be parsed"""
+    return {
+        "technical_skills": [],
+        "soft_skills": [],
+        "certifications": [],
+        "languages": []
+    }
+
+
+taxonomy_registry.register("skills", SKILLS_DATA_PATH, _default_skills_data, _fallback_skills_data)
+
+
 def load_skills_data():
-    try:
-        if os.path.exists(SKILLS_DATA_PATH):
-            with open(SKILLS_DATA_PATH, 'r') as f:
-                return json.load(f)
-        else:
-            # If file doesn't exist, return default skills categorization
-            return {
-                "technical_skills": [
-                    "python", "java", "javascript", "html", "css", "react", "angular", "vue", 
-                    "node.js", "express", "flask", "django", "spring", "hibernate", "sql", 
-                    "mysql", "postgresql", "mongodb", "redis", "aws", "azure", "gcp", 
-                    "docker", "kubernetes", "jenkins", "git", "jira", "agile", "scrum",
-                    "c++", "c#", "php", "ruby", "swift", "kotlin", "rust", "golang", "scala",
-                    "machine learning", "deep learning", "artificial intelligence", "data science",
-                    "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "hadoop", "spark",
-                    "tableau", "power bi", "excel", "word", "powerpoint", "photoshop", "illustrator",
-                    "figma", "sketch", "adobe xd", "ui/ux", "seo", "digital marketing"
-                ],
-                "soft_skills": [
-                    "communication", "teamwork", "problem solving", "critical thinking", 
-                    "creativity", "leadership", "time management", "adaptability", "flexibility",
-                    "organization", "planning", "decision making", "conflict resolution",
-                    "attention to detail", "interpersonal skills", "emotional intelligence",
-                    "negotiation", "persuasion", "presentation", "public speaking", "writing",
-                    "customer service", "project management", "prioritization", "self-motivated",
-                    "analytical", "logical", "innovative", "patient", "reliable", "responsible"
-                ],
-                "certifications": [
-                    "aws certified", "microsoft certified", "google certified", "comptia", 
-                    "cisco certified", "pmp", "six sigma", "itil", "scrum master", "agile certified",
-                    "cpa", "cfa", "ceh", "cissp", "ccna", "ccnp", "mcsa", "mcse", "rhce", "salesforce"
-                ],
-                "languages": [
-                    "english", "spanish", "french", "german", "italian", "portuguese", "russian",
-                    "chinese", "japanese", "korean", "arabic", "hindi", "dutch", "swedish", "norwegian"
-                ]
-            }
-    except Exception as e:
-        logger.error(f"Error loading skills data: {str(e)}")
-        return {
-            "technical_skills": [],
-            "soft_skills": [],
-            "certifications": [],
-            "languages": []
-        }
-
-def extract_skills(doc, text):
+    """Return the skills taxonomy from the in-memory registry (read-only)"""
+    return taxonomy_registry.get("skills").data
+
+
+# Taxonomy categories searched by the compiled matcher, mapped to the result key they fill
+SKILL_CATEGORIES = [
+    ("technical_skills", "technical"),
+    ("soft_skills", "soft"),
+    ("certifications", "certifications"),
+    ("languages", "languages"),
+]
+
+# Delimiter fragments from the skills section that are never skills on their own
+COMMON_WORDS = {"and", "or", "the", "a", "an", "in", "on", "at", "to", "for"}
+
+_skill_matcher = None
+_skill_matcher_version = None
+
+
+def build_skill_matcher(skills_data):
+    """
+    Compile the skills taxonomy into a single multi-pattern matcher
+
+    Args:
+        skills_data (dict): Skills taxonomy as returned by load_skills_data()
+
+    Returns:
+        KeywordMatcher: Matcher whose payloads are (result key, taxonomy order) pairs
+    """
+    matcher = KeywordMatcher()
+    for category, result_key in SKILL_CATEGORIES:
+        for order, skill in enumerate(skills_data.get(category, [])):
+            matcher.add(skill, (result_key, order))
+    matcher.build()
+    logger.debug(f"Compiled skill matcher with {len(matcher)} terms")
+    return matcher
+
+
+def get_skill_matcher():
+    """Return the process-wide skill matcher, rebuilding it when the taxonomy version changes"""
+    global _skill_matcher, _skill_matcher_version
+    entry = taxonomy_registry.get("skills")
+    if _skill_matcher is None or _skill_matcher_version != entry.version:
+        try:
+            matcher = build_skill_matcher(entry.data)
+        except Exception as e:
+            taxonomy_registry.record_build("skills", entry.version, str(e))
+            if _skill_matcher is None:
+                raise
+            # Keep serving the last good matcher, and don't recompile the broken version on every call
+            logger.error(f"Error compiling skills taxonomy {entry.version}: {str(e)}")
+            _skill_matcher_version = entry.version
+            return _skill_matcher
+        _skill_matcher = matcher
+        _skill_matcher_version = entry.version
+        taxonomy_registry.record_build("skills", entry.version)
+    return _skill_matcher
+
+
+def extract_skills(doc, text, sections=None):
     """
     Extract and categorize skills from resume text
     
     Args:
         doc (spacy.tokens.Doc): spaCy Doc object of resume text
         text (str): Raw text of the resume
+        sections (SectionIndex): Sections from segment_sections(), computed if not given
         
     Returns:
         dict: Skills information categorized by type
     """
-    skills_data = load_skills_data()
+    matcher = get_skill_matcher()
     
     # Initialize results
     extracted_skills = {
@@ -80,39 +145,32 @@ def extract_skills(doc, text):
     # Normalize text for better matching
     text_lower = text.lower()
     
-    # Extract skills by category
-    for skill in skills_data.get("technical_skills", []):
-        skill_pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(skill_pattern, text_lower):
-            extracted_skills["technical"].append(skill)
-            extracted_skills["skills"].append(skill)
+    # Find every taxonomy term in one pass, then emit each category in taxonomy order
+    positions = matcher.find_all(text_lower)
+    found = {result_key: [] for _, result_key in SKILL_CATEGORIES}
+    for skill in positions:
+        for result_key, order in matcher.payloads(skill):
+            found[result_key].append((order, skill))
     
-    for skill in skills_data.get("soft_skills", []):
-        skill_pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(skill_pattern, text_lower):
-            extracted_skills["soft"].append(skill)
-            extracted_skills["skills"].append(skill)
+    for _, result_key in SKILL_CATEGORIES:
+        extracted_skills[result_key] = [skill for _, skill in sorted(found[result_key])]
+    extracted_skills["skills"] = extracted_skills["technical"] + extracted_skills["soft"]
     
-    for cert in skills_data.get("certifications", []):
-        cert_pattern = r'\b' + re.escape(cert) + r'\b'
-        if re.search(cert_pattern, text_lower):
-            extracted_skills["certifications"].append(cert)
-    
-    for lang in skills_data.get("languages", []):
-        lang_pattern = r'\b' + re.escape(lang) + r'\b'
-        if re.search(lang_pattern, text_lower):
-            extracted_skills["languages"].append(lang)
+    # Offsets (into the lower-cased text) of every taxonomy hit, for reuse downstream
+    extracted_skills["positions"] = {skill: [list(span) for span in spans] for skill, spans in positions.items()}
     
     # Extract potential skills mentioned in skills section
-    skills_section = extract_skills_section(text)
+    skills_section = extract_skills_section(text, sections)
     if skills_section:
         # Split by common delimiters and clean up
         potential_skills = re.split(r'[,;•\n]', skills_section)
+        seen = set(extracted_skills["skills"])
         for skill in potential_skills:
             skill = skill.strip().lower()
-            if skill and len(skill) > 2 and skill not in extracted_skills["skills"]:
+            if skill and len(skill) > 2 and skill not in seen:
                 # Only add if it's not already found and looks like a valid skill (not just a word)
-                if not any(common_word == skill for common_word in ["and", "or", "the", "a", "an", "in", "on", "at", "to", "for"]):
+                if skill not in COMMON_WORDS:
+                    seen.add(skill)
                     extracted_skills["skills"].append(skill)
     
     # Add skills count and percentages
@@ -128,34 +186,11 @@ def extract_skills(doc, text):
     return extracted_skills
 
 
-def extract_skills_section(text):
+def extract_skills_section(text, sections=None):
     """Extract the skills section from resume text"""
-    lines = text.split('\n')
-    skills_section = ""
-    in_skills_section = False
-    
-    for i, line in enumerate(lines):
-        line_lower = line.lower().strip()
-        
-        # Check if this line indicates the start of skills section
-        if (line_lower == "skills" or 
-            line_lower == "technical skills" or 
-            line_lower.startswith("skills:") or 
-            line_lower.startswith("technical skills:") or
-            "core skills" in line_lower) and len(line) < 50:
-            in_skills_section = True
-            continue
-        
-        # End skills section if we reach a new section
-        if in_skills_section and line.strip() and line[0].isupper() and len(line) < 50:
-            next_word = line.split()[0].lower() if line.split() else ""
-            if next_word in ["experience", "education", "projects", "certifications", "languages"]:
-                break
-        
-        # Add line to skills section if we're in it
-        if in_skills_section and line.strip():
-            skills_section += line + "\n"
-    
+    if sections is None:
+        sections = segment_sections(text)
+    skills_section, _ = sections.join("skills", "\n")
     return skills_section
 
 
@@ -1,47 +1,144 @@
 import os
 import logging
-from flask import Flask, render_template, request, jsonify
-import spacy
+import io
+import gc
+import json
+import threading
+import time
+from flask import Flask, Request, Response, g, render_template, request, jsonify
 from werkzeug.utils import secure_filename
 import tempfile
-import uuid
+import zipfile
 
-from resume_parser import extract_text, extract_info
-from analyzer import extract_skills
-from job_matcher import match_job_description, predict_job_role
+from resume_parser import extract_text
+from pipeline import (
+    AnalysisError, analyze_profile, analyze_batch, build_response, refresh_profile, rescore_stored, taxonomy_cache_tag
+)
+from jobs import DONE, FAILED, JobError, JobWorkerPool, create_job_queue
+from nlp_model import limit_text, load_model, model_status, parse_many, parse_text, warm_up_taxonomies
+from job_profiles import JobProfileRegistry, rank_candidates
+from job_matcher import compile_job_profile
+from candidate_store import CandidateStore, normalize_skill
+from taxonomy import registry as taxonomy_registry
+from cache import AnalysisCache, content_hash_stream
+from metrics import (
+    analysis_errors, analysis_memory, current_timings, files_analyzed, http_request_seconds, http_requests,
+    near_duplicates_reused, registry as metrics_registry, reset_timings, stage, start_timings, text_truncated
+)
+from near_duplicates import NearDuplicateIndex
+from memory import MemoryUsage
+from responses import compress_response, json_response, shape_result
+from admission import AdmissionController, Overloaded
+from doc_store import DocStore
+from profiling import RequestProfile, should_profile
+from pdf_extractor import sample_page_workers
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+
+class SpooledUploadRequest(Request):
+    """Request that keeps uploads in memory up to UPLOAD_SPOOL_MAX_SIZE, then spools to an anonymous temp file"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_MAX_SIZE'], mode='rb+')
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = SpooledUploadRequest
 app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key")
 
 # Configure upload settings
-UPLOAD_FOLDER = tempfile.gettempdir()
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_SPOOL_MAX_SIZE'] = int(os.environ.get("UPLOAD_SPOOL_MAX_SIZE", str(2 * 1024 * 1024)))
 
-# Load NLP model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logger.info("spaCy model loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading spaCy model: {str(e)}")
-    # Fallback to downloading the model if not present
-    logger.info("Attempting to download spaCy model...")
-    import subprocess
-    try:
-        subprocess.run([
-            "python", "-m", "spacy", "download", "en_core_web_sm"
-        ], check=True)
-        nlp = spacy.load("en_core_web_sm")
-        logger.info("spaCy model downloaded and loaded successfully")
-    except Exception as download_error:
-        logger.error(f"Failed to download spaCy model: {str(download_error)}")
-        nlp = None
+# Batch analysis settings
+app.config['BATCH_MAX_FILES'] = int(os.environ.get("BATCH_MAX_FILES", "500"))
+app.config['BATCH_MAX_CONTENT_LENGTH'] = int(os.environ.get("BATCH_MAX_CONTENT_LENGTH", str(256 * 1024 * 1024)))
+app.config['NLP_BATCH_SIZE'] = int(os.environ.get("NLP_BATCH_SIZE", "16"))
+app.config['NLP_PROCESSES'] = int(os.environ.get("NLP_PROCESSES", "1"))
+
+# Analysis cache settings
+app.config['ANALYSIS_CACHE_PATH'] = os.environ.get(
+    "ANALYSIS_CACHE_PATH", os.path.join(tempfile.gettempdir(), "hirelens-cache.sqlite3")
+)
+app.config['ANALYSIS_CACHE_SIZE'] = int(os.environ.get("ANALYSIS_CACHE_SIZE", "256"))
+app.config['ANALYSIS_CACHE_DISK_ENTRIES'] = int(os.environ.get("ANALYSIS_CACHE_DISK_ENTRIES", "100000"))
+
+# Async job queue settings ("sqlite" shares jobs across workers, "memory" keeps them in-process)
+app.config['JOB_QUEUE_BACKEND'] = os.environ.get("JOB_QUEUE_BACKEND", "sqlite")
+app.config['JOB_QUEUE_PATH'] = os.environ.get(
+    "JOB_QUEUE_PATH", os.path.join(tempfile.gettempdir(), "hirelens-jobs.sqlite3")
+)
+app.config['JOB_WORKERS'] = int(os.environ.get("JOB_WORKERS", "2"))
+# Each event stream holds a request thread, so streams are short and few; clients poll after a timeout event
+app.config['JOB_EVENTS_TIMEOUT'] = float(os.environ.get("JOB_EVENTS_TIMEOUT", "30"))
+app.config['JOB_EVENTS_MAX_STREAMS'] = int(os.environ.get("JOB_EVENTS_MAX_STREAMS", "2"))
+app.config['JOB_EVENTS_POLL_INTERVAL'] = float(os.environ.get("JOB_EVENTS_POLL_INTERVAL", "0.5"))
+
+# Job profile settings
+app.config['JOB_PROFILES_PATH'] = os.environ.get(
+    "JOB_PROFILES_PATH", os.path.join(tempfile.gettempdir(), "hirelens-job-profiles.sqlite3")
+)
+app.config['RANK_MAX_TOP_K'] = int(os.environ.get("RANK_MAX_TOP_K", "1000"))
+
+# Candidate store settings (SQLite locally, PostgreSQL through DATABASE_URL)
+app.config['DATABASE_URL'] = os.environ.get(
+    "DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "hirelens-candidates.sqlite3")
+)
+app.config['CANDIDATE_STORE_ENABLED'] = os.environ.get("CANDIDATE_STORE_ENABLED", "1") == "1"
+app.config['CANDIDATE_SEARCH_MAX_LIMIT'] = int(os.environ.get("CANDIDATE_SEARCH_MAX_LIMIT", "500"))
+
+# Near-duplicate detection (MinHash/LSH over the extracted text)
+app.config['NEAR_DUPLICATE_ENABLED'] = os.environ.get("NEAR_DUPLICATE_ENABLED", "1") == "1"
+app.config['NEAR_DUPLICATE_PATH'] = os.environ.get(
+    "NEAR_DUPLICATE_PATH", os.path.join(tempfile.gettempdir(), "hirelens-near-duplicates.sqlite3")
+)
+app.config['NEAR_DUPLICATE_THRESHOLD'] = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+
+# Parsed docs kept (as DocBin) for re-scoring after taxonomy changes
+app.config['DOC_STORE_ENABLED'] = os.environ.get("DOC_STORE_ENABLED", "1") == "1"
+app.config['DOC_STORE_PATH'] = os.environ.get(
+    "DOC_STORE_PATH", os.path.join(tempfile.gettempdir(), "hirelens-docs.sqlite3")
+)
+
+# Admission control for /analyze: concurrent analyses per worker process, requests
+# allowed to wait for a slot, how long they wait, and how long a request waits for its result
+app.config['ANALYSIS_WORKERS'] = int(os.environ.get("ANALYSIS_WORKERS", "2"))
+app.config['ANALYSIS_MAX_WAITING'] = int(os.environ.get("ANALYSIS_MAX_WAITING", "4"))
+app.config['ANALYSIS_QUEUE_TIMEOUT'] = float(os.environ.get("ANALYSIS_QUEUE_TIMEOUT", "5"))
+app.config['ANALYSIS_TIMEOUT'] = float(os.environ.get("ANALYSIS_TIMEOUT", "60"))
+
+analysis_cache = AnalysisCache(
+    app.config['ANALYSIS_CACHE_PATH'],
+    max_entries=app.config['ANALYSIS_CACHE_SIZE'],
+    max_disk_entries=app.config['ANALYSIS_CACHE_DISK_ENTRIES']
+)
+job_profiles = JobProfileRegistry(app.config['JOB_PROFILES_PATH'])
+candidate_store = CandidateStore(app.config['DATABASE_URL'])
+near_duplicates = None
+if app.config['NEAR_DUPLICATE_ENABLED']:
+    near_duplicates = NearDuplicateIndex(
+        app.config['NEAR_DUPLICATE_PATH'], threshold=app.config['NEAR_DUPLICATE_THRESHOLD']
+    )
+
+admission = AdmissionController(
+    max_in_flight=app.config['ANALYSIS_WORKERS'],
+    max_waiting=app.config['ANALYSIS_MAX_WAITING'],
+    wait_timeout=app.config['ANALYSIS_QUEUE_TIMEOUT'],
+    deadline=app.config['ANALYSIS_TIMEOUT']
+)
+doc_store = None
+if app.config['DOC_STORE_ENABLED']:
+    doc_store = DocStore(app.config['DOC_STORE_PATH'])
+
+# Load and warm up the NLP model and compiled taxonomies. A missing model is a
+# startup failure; with gunicorn's preload_app this runs once in the master.
+nlp = load_model()
+warm_up_taxonomies()
 
 
 def allowed_file(filename):
@@ -54,6 +151,220 @@ def index():
     return render_template('index.html')
 
 
+def store_candidate(resume_id, profile, filename=None):
+    """Persist an analysis in the candidate store; failures are logged, not raised"""
+    if not app.config['CANDIDATE_STORE_ENABLED']:
+        return
+    try:
+        candidate_store.save(resume_id, profile, filename)
+    except Exception as e:
+        logger.error(f"Error saving candidate {resume_id}: {str(e)}")
+
+
+def store_parsed(resume_id, text, doc, profile, filename=None):
+    """Keep a parsed resume for re-scoring; failures are logged, not raised"""
+    if doc_store is None:
+        return
+    try:
+        tag = taxonomy_cache_tag()
+        with stage('store_doc'):
+            doc_store.ensure_snapshot(tag, taxonomy_registry.snapshot)
+            doc_store.save(resume_id, text, doc, profile, tag, filename)
+    except Exception as e:
+        logger.error(f"Error storing parsed resume {resume_id}: {str(e)}")
+
+
+def reuse_near_duplicate(resume_id, text):
+    """
+    Build a profile from the analysis of a stored near-duplicate of this resume
+    
+    Indexes the resume either way, so later re-uploads can match it.
+    
+    Returns:
+        dict: Profile with a near_duplicate entry, or None if there is no
+            near-duplicate with a cached analysis
+    """
+    if near_duplicates is None:
+        return None
+    signature = near_duplicates.signature(text)
+    profile = None
+    for duplicate_id, similarity in near_duplicates.query(signature, exclude=resume_id):
+        duplicate = analysis_cache.get(profile_cache_keys(duplicate_id)[1])
+        if duplicate is not None:
+            profile = refresh_profile(duplicate, text, nlp)
+            profile['near_duplicate'] = {'resume_id': duplicate_id, 'similarity': round(similarity, 4)}
+            near_duplicates_reused.inc()
+            logger.info(f"Resume {resume_id} reuses the analysis of near-duplicate {duplicate_id} ({similarity:.2f})")
+            break
+    near_duplicates.add(resume_id, signature)
+    return profile
+
+
+def extract_limited_text(stream, file_extension):
+    """Extract text from an upload and cut it to the configured character and token limits"""
+    text = extract_text(stream, file_extension)
+    if not text:
+        return text
+    limited, truncated_by = limit_text(nlp, text)
+    if truncated_by is not None:
+        text_truncated.inc(limit=truncated_by)
+        logger.warning(f"Resume text cut from {len(text)} to {len(limited)} characters by the {truncated_by} limit")
+    return limited
+
+
+def run_analysis(stream, file_extension, job_description='', set_stage=None, filename=None, file_hash=None):
+    """
+    Analyze one uploaded resume, reusing cached text and analysis where possible
+    
+    Args:
+        stream (file object): Seekable binary stream of the upload
+        file_extension (str): File extension (pdf or docx)
+        job_description (str): Optional job description to match against
+        set_stage (callable): Optional callback receiving the name of each stage as it starts
+        filename (str): Original upload name, kept with the stored candidate
+        file_hash (str): Content hash of the upload, when the caller already computed it
+        
+    Returns:
+        dict: Analysis result in the /analyze response format
+    """
+    set_stage = set_stage or (lambda name: None)
+    files_analyzed.inc(file_type=file_extension)
+    memory_usage = MemoryUsage()
+    
+    # Uploads are cached by content: text by file hash, the JD-independent
+    # analysis by file hash plus taxonomy version
+    file_hash = file_hash or content_hash_stream(stream)
+    text_key = f"text:{file_hash}"
+    profile_key = f"profile:{file_hash}:{taxonomy_cache_tag()}"
+    
+    text = analysis_cache.get(text_key)
+    profile = analysis_cache.get(profile_key)
+    
+    if text is None:
+        # Extract text straight from the in-memory (or spooled) upload
+        set_stage('extracting_text')
+        with stage('extract_text'):
+            text = extract_limited_text(stream, file_extension)
+        if not text:
+            analysis_errors.inc(reason='no_text')
+            raise AnalysisError('Could not extract text from the resume')
+        analysis_cache.put(text_key, text)
+    
+    if profile is None:
+        # A lightly edited re-upload reuses its near-duplicate's analysis, parsing only its own personal info
+        profile = reuse_near_duplicate(file_hash, text)
+        if profile is not None:
+            analysis_cache.put(profile_key, profile)
+            store_candidate(file_hash, profile, filename)
+            store_parsed(file_hash, text, None, profile, filename)
+    
+    if profile is None:
+        try:
+            # Process the text with spaCy, in chunks if it is long
+            set_stage('parsing')
+            with stage('nlp'):
+                doc = parse_text(nlp, text)
+            
+            # Run the job-description independent analysis stages
+            set_stage('analyzing')
+            profile = analyze_profile(doc, text)
+        except MemoryError:
+            # Hit the worker memory ceiling; drop this document and keep serving
+            gc.collect()
+            analysis_errors.inc(reason='memory')
+            raise AnalysisError('The resume is too large to analyze', 413)
+        analysis_cache.put(profile_key, profile)
+        store_candidate(file_hash, profile, filename)
+        store_parsed(file_hash, text, doc, profile, filename)
+    
+    # Only job description matching runs again on a cache hit
+    set_stage('matching')
+    response = build_response(profile, text, job_description)
+    # Lets clients rank this resume again later without re-uploading it
+    response['resume_id'] = file_hash
+    if profile.get('near_duplicate'):
+        response['near_duplicate'] = profile['near_duplicate']
+    
+    growth = memory_usage.growth()
+    if growth is not None:
+        analysis_memory.observe(growth)
+    timings = current_timings()
+    if timings is not None:
+        timings.note('memory', memory_usage.describe())
+    return response
+
+
+def profiled_analysis(stream, file_extension, job_description='', filename=None):
+    """
+    Run run_analysis() under the stack sampler
+    
+    The profile is tagged with the upload's hash, size, type and (for PDFs
+    that were extracted) page count. PDF pages are still extracted in the
+    page pool under their time budgets; the pool workers sample themselves
+    so that PyPDF2 shows up in the profile.
+    
+    Returns:
+        tuple: (analysis result, base name of the written profile files)
+    """
+    # Hashed once, outside the profile; run_analysis reuses it
+    file_hash = content_hash_stream(stream)
+    tags = {'hash': file_hash[:12], 'bytes': stream_size(stream), 'type': file_extension}
+    with RequestProfile(tags) as profile, sample_page_workers() as worker_samples:
+        try:
+            result = run_analysis(stream, file_extension, job_description, filename=filename, file_hash=file_hash)
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                profile.tags['pages'] = timings.notes.get('pages')
+            profile.worker_samples.extend(worker_samples)
+    return result, profile.name
+
+
+def process_analysis_job(payload, params, set_stage):
+    """Job queue handler: run the analysis on a queued upload"""
+    try:
+        return run_analysis(
+            io.BytesIO(payload), params['file_extension'], params.get('job_description', ''),
+            set_stage, filename=params.get('filename')
+        )
+    except AnalysisError as e:
+        raise JobError(str(e))
+
+
+def process_rescore_job(set_stage):
+    """Job queue handler: re-score stored resumes after a taxonomy change"""
+    if doc_store is None:
+        raise JobError('The doc store is disabled')
+    
+    def on_update(resume_id, profile, filename):
+        analysis_cache.put(profile_cache_keys(resume_id)[1], profile)
+        store_candidate(resume_id, profile, filename)
+    
+    return rescore_stored(
+        doc_store, nlp.vocab, on_update,
+        on_progress=lambda done, total: set_stage(f'rescoring {done}/{total}')
+    )
+
+
+def process_job(payload, params, set_stage):
+    """Job queue handler: dispatch on the job kind"""
+    if params.get('kind') == 'rescore':
+        return process_rescore_job(set_stage)
+    return process_analysis_job(payload, params, set_stage)
+
+
+job_queue = create_job_queue(app.config['JOB_QUEUE_BACKEND'], app.config['JOB_QUEUE_PATH'])
+job_workers = JobWorkerPool(job_queue, process_job, workers=app.config['JOB_WORKERS'])
+job_event_streams = threading.BoundedSemaphore(app.config['JOB_EVENTS_MAX_STREAMS'])
+
+
+def job_urls(job_id):
+    return {
+        'status_url': f'/jobs/{job_id}',
+        'events_url': f'/jobs/{job_id}/events'
+    }
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze_resume():
     if 'resume' not in request.files:
@@ -68,56 +379,471 @@ def analyze_resume():
         return jsonify({'error': f'File type not supported. Please upload a PDF or DOCX file.'}), 400
     
     try:
-        # Save file temporarily with unique name
         filename = secure_filename(file.filename)
         file_extension = filename.rsplit('.', 1)[1].lower()
-        temp_filename = f"{uuid.uuid4().hex}.{file_extension}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
-        file.save(filepath)
-        logger.debug(f"Saved file to {filepath}")
         
         # Get job description if provided
         job_description = request.form.get('job_description', '')
         
-        # Extract text from resume
-        text = extract_text(filepath, file_extension)
-        if not text:
-            return jsonify({'error': 'Could not extract text from the resume'}), 400
-        
-        # Process the text with spaCy
-        doc = nlp(text)
+        # In async mode, queue the upload and return the job id straight away
+        if request.args.get('async') == '1' or request.form.get('async') == '1':
+            job_workers.ensure_started()
+            job_id = job_queue.submit(file.stream.read(), {
+                'filename': filename,
+                'file_extension': file_extension,
+                'job_description': job_description
+            })
+            return jsonify({'job_id': job_id, 'status': 'queued', **job_urls(job_id)}), 202
         
-        # Extract structured information
-        info = extract_info(doc, text)
+        # CPU-bound work runs on the admission pool so request threads stay free for other endpoints.
+        # The pool gets its own copy of the upload: Flask closes file.stream when the request ends,
+        # which may be before an analysis that overran the deadline has finished and cached its result.
+        upload = io.BytesIO(file.stream.read())
+        if should_profile(request.headers):
+            result, profile_name = admission.run(
+                profiled_analysis, upload, file_extension, job_description, filename=filename
+            )
+            response = json_response(shape_result(result, request.args))
+            if profile_name:
+                response.headers['X-Profile'] = profile_name
+            return response
         
-        # Extract skills
-        skills_data = extract_skills(doc, text)
-        
-        # Match against job description
-        job_match = {}
-        job_role_prediction = {}
-        if job_description:
-            job_match = match_job_description(text, job_description, skills_data['skills'])
-            job_role_prediction = predict_job_role(text, skills_data['skills'])
+        result = admission.run(run_analysis, upload, file_extension, job_description, filename=filename)
+        return json_response(shape_result(result, request.args))
+    
+    except AnalysisError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Overloaded as e:
+        return jsonify({'error': str(e)}), e.status_code, {'Retry-After': str(e.retry_after)}
+    except Exception as e:
+        logger.error(f"Error during resume analysis: {str(e)}", exc_info=True)
+        analysis_errors.inc(reason='exception')
+        return jsonify({'error': f'An error occurred during analysis: {str(e)}'}), 500
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job_workers.ensure_started()
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.get('result') is not None:
+        job['result'] = shape_result(job['result'], request.args)
+    return json_response({**job, **job_urls(job_id)})
+
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    job_workers.ensure_started()
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if not job_event_streams.acquire(blocking=False):
+        return jsonify({
+            'error': 'Too many event streams; poll the job status instead', **job_urls(job_id)
+        }), 429, {'Retry-After': '1'}
+    # The generator runs after the request context is gone
+    args = request.args.copy()
+    
+    def generate():
+        # Emit a stage event whenever the stage changes, then the final job state
+        last_stage = None
+        deadline = time.monotonic() + app.config['JOB_EVENTS_TIMEOUT']
+        while time.monotonic() < deadline:
+            job = job_queue.get(job_id)
+            if job is None:
+                break
+            if job['stage'] != last_stage:
+                last_stage = job['stage']
+                yield f"event: stage\ndata: {json.dumps({'stage': last_stage})}\n\n"
+            if job['status'] in (DONE, FAILED):
+                if job.get('result') is not None:
+                    job['result'] = shape_result(job['result'], args)
+                yield f"event: {job['status']}\ndata: {json.dumps(job)}\n\n"
+                return
+            time.sleep(app.config['JOB_EVENTS_POLL_INTERVAL'])
+        yield "event: timeout\ndata: {}\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Frees the slot when the stream ends or the client goes away, even if the generator never started
+    response.call_on_close(job_event_streams.release)
+    return response
+
+
+def stream_size(stream):
+    """Return the size of a seekable file object, leaving it rewound"""
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    return size
+
+
+def iter_batch_uploads(files):
+    """
+    Yield (filename, file object or None, size, error or None) for each uploaded resume
+
+    Zip archives are expanded one entry at a time into memory; entries that
+    aren't PDF/DOCX are reported as errors.
+    """
+    max_entry_size = app.config['MAX_CONTENT_LENGTH']
+    for file in files:
+        filename = secure_filename(file.filename or '')
+        if filename.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(file.stream) as archive:
+                    for entry in archive.infolist():
+                        if entry.is_dir():
+                            continue
+                        entry_name = f"{filename}/{entry.filename}"
+                        if not allowed_file(entry.filename):
+                            yield entry_name, None, 0, 'File type not supported. Please upload a PDF or DOCX file.'
+                        elif entry.file_size > max_entry_size:
+                            yield entry_name, None, 0, 'File is too large'
+                        else:
+                            yield entry_name, io.BytesIO(archive.read(entry)), entry.file_size, None
+            except zipfile.BadZipFile:
+                yield filename, None, 0, 'Invalid zip archive'
+        elif allowed_file(filename):
+            yield filename, file.stream, stream_size(file.stream), None
         else:
-            job_role_prediction = predict_job_role(text, skills_data['skills'])
-        
-        # Clean up the temporary file
-        os.remove(filepath)
-        
-        # Prepare response
-        response = {
-            'personal_info': info,
-            'skills': skills_data,
-            'job_match': job_match,
-            'job_role_prediction': job_role_prediction
-        }
+            yield filename or '(unnamed)', None, 0, 'File type not supported. Please upload a PDF or DOCX file.'
+
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_token = start_timings()
+
+
+@app.after_request
+def record_request_metrics(response):
+    timings = current_timings()
+    if timings is not None:
+        # Per-stage breakdown for browser devtools, only when analysis stages ran
+        if timings.durations or timings.notes:
+            response.headers['Server-Timing'] = timings.header()
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        http_requests.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+        http_request_seconds.observe(time.perf_counter() - timings.started, endpoint=endpoint)
+    metrics_registry.flush()
+    return response
+
+
+@app.after_request
+def compress(response):
+    return compress_response(response, request.headers.get('Accept-Encoding'))
+
+
+@app.teardown_request
+def reset_request_metrics(exc):
+    token = g.pop('metrics_token', None)
+    if token is not None:
+        reset_timings(token)
+
+
+@app.route('/metrics')
+def metrics():
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/readyz')
+def readyz():
+    # Workers also start on boot under gunicorn; this covers the development server
+    job_workers.ensure_started()
+    # Reports the last model and taxonomy build status only; taxonomy edits are compiled on the analysis path
+    status = model_status()
+    status['admission'] = admission.stats()
+    # A worker that would shed every new analysis should get no more traffic
+    admission_stats = status['admission']
+    if (admission_stats['in_flight'] >= admission_stats['max_in_flight']
+            and admission_stats['waiting'] >= admission_stats['max_waiting']):
+        status['ready'] = False
+        status['error'] = status['error'] or 'Analysis queue is full'
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify(analysis_cache.stats())
+
+
+@app.route('/rescore', methods=['GET', 'POST'])
+def rescore():
+    if doc_store is None:
+        return jsonify({'error': 'The doc store is disabled'}), 404
+    
+    if request.method == 'GET':
+        tag = taxonomy_cache_tag()
+        try:
+            return jsonify({'taxonomy_tag': tag, 'stale': doc_store.count_stale(tag), **doc_store.stats()})
+        except Exception as e:
+            logger.error(f"Error reading doc store stats: {str(e)}")
+            return jsonify({'error': f'Could not read the doc store: {str(e)}'}), 500
+    
+    # Re-scoring runs as a background job; progress shows up as its stage
+    job_workers.ensure_started()
+    job_id = job_queue.submit(b'', {'kind': 'rescore'})
+    return jsonify({'job_id': job_id, 'status': 'queued', **job_urls(job_id)}), 202
+
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_resume_batch():
+    # Batches may be larger than a single upload
+    request.max_content_length = app.config['BATCH_MAX_CONTENT_LENGTH']
+    files = request.files.getlist('resumes')
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+    
+    job_description = request.form.get('job_description', '')
+    
+    items = []
+    errors = {}
+    total_bytes = 0
+    for filename, stream, size, error in iter_batch_uploads(files):
+        if len(items) >= app.config['BATCH_MAX_FILES']:
+            return jsonify({'error': f"Too many files in batch (max {app.config['BATCH_MAX_FILES']})"}), 400
+        total_bytes += size
+        if total_bytes > app.config['BATCH_MAX_CONTENT_LENGTH']:
+            return jsonify({'error': 'Batch is too large'}), 413
         
-        return jsonify(response)
+        if error is None:
+            file_extension = filename.rsplit('.', 1)[1].lower()
+            files_analyzed.inc(file_type=file_extension)
+            try:
+                with stage('extract_text'):
+                    text = extract_limited_text(stream, file_extension)
+                if not text:
+                    error = 'Could not extract text from the resume'
+                    analysis_errors.inc(reason='no_text')
+            except Exception as e:
+                logger.error(f"Error extracting text from {filename}: {str(e)}")
+                error = f'Could not extract text from the resume: {str(e)}'
+        if error is not None:
+            errors[len(items)] = error
+            text = None
+        items.append((filename, text))
     
+    try:
+        results = analyze_batch(
+            nlp, items, job_description,
+            batch_size=app.config['NLP_BATCH_SIZE'],
+            n_process=app.config['NLP_PROCESSES']
+        )
     except Exception as e:
-        logger.error(f"Error during resume analysis: {str(e)}", exc_info=True)
+        logger.error(f"Error during batch analysis: {str(e)}", exc_info=True)
         return jsonify({'error': f'An error occurred during analysis: {str(e)}'}), 500
+    
+    for position, error in errors.items():
+        results[position] = {'filename': items[position][0], 'error': error}
+    
+    for entry in results:
+        if 'result' in entry:
+            entry['result'] = shape_result(entry['result'], request.args)
+    
+    failed = sum(1 for result in results if 'error' in result)
+    return json_response({
+        'results': results,
+        'total': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed
+    })
+
+
+def profile_cache_keys(resume_id):
+    return f"text:{resume_id}", f"profile:{resume_id}:{taxonomy_cache_tag()}"
+
+
+def load_candidate_profiles(files, resume_ids):
+    """
+    Resolve uploaded files and previously analyzed resume ids to cached analyses
+    
+    Uploads not seen before are extracted and parsed (together, through
+    nlp.pipe) and their analyses cached like /analyze does.
+    
+    Returns:
+        tuple: (list of candidate dicts with resume_id, filename, text and profile,
+            list of {"filename" or "resume_id", "error"} dicts)
+    """
+    candidates = []
+    errors = []
+    pending = []
+    
+    for filename, stream, size, error in iter_batch_uploads(files):
+        if error is not None:
+            errors.append({'filename': filename, 'error': error})
+            continue
+        resume_id = content_hash_stream(stream)
+        text_key, profile_key = profile_cache_keys(resume_id)
+        text = analysis_cache.get(text_key)
+        if text is None:
+            text = extract_limited_text(stream, filename.rsplit('.', 1)[1].lower())
+            if not text:
+                errors.append({'filename': filename, 'error': 'Could not extract text from the resume'})
+                continue
+            analysis_cache.put(text_key, text)
+        candidate = {'resume_id': resume_id, 'filename': filename, 'text': text, 'profile': analysis_cache.get(profile_key)}
+        if candidate['profile'] is None:
+            candidate['profile'] = reuse_near_duplicate(resume_id, text)
+            if candidate['profile'] is not None:
+                analysis_cache.put(profile_key, candidate['profile'])
+                store_candidate(resume_id, candidate['profile'], filename)
+                store_parsed(resume_id, text, None, candidate['profile'], filename)
+        candidates.append(candidate)
+        if candidate['profile'] is None:
+            pending.append(candidate)
+    
+    for resume_id in resume_ids:
+        text_key, profile_key = profile_cache_keys(resume_id)
+        text = analysis_cache.get(text_key)
+        if text is None:
+            errors.append({'resume_id': resume_id, 'error': 'Unknown resume id'})
+            continue
+        candidate = {'resume_id': resume_id, 'filename': None, 'text': text, 'profile': analysis_cache.get(profile_key)}
+        candidates.append(candidate)
+        if candidate['profile'] is None:
+            pending.append(candidate)
+    
+    docs = parse_many(
+        nlp,
+        ((candidate['text'], candidate) for candidate in pending),
+        batch_size=app.config['NLP_BATCH_SIZE']
+    )
+    for doc, candidate in docs:
+        candidate['profile'] = analyze_profile(doc, candidate['text'])
+        analysis_cache.put(profile_cache_keys(candidate['resume_id'])[1], candidate['profile'])
+        store_candidate(candidate['resume_id'], candidate['profile'], candidate['filename'])
+        store_parsed(candidate['resume_id'], candidate['text'], doc, candidate['profile'], candidate['filename'])
+    
+    return candidates, errors
+
+
+def job_profile_summary(profile_id, profile):
+    return {
+        'id': profile_id,
+        'title': profile.title,
+        'keywords': profile.keywords,
+        'keyword_count': len(profile.keywords)
+    }
+
+
+@app.route('/job-profiles', methods=['POST'])
+def create_job_profile():
+    data = request.get_json(silent=True) or request.form
+    job_description = (data.get('job_description') or '').strip()
+    if not job_description:
+        return jsonify({'error': 'No job description provided'}), 400
+    
+    profile_id, profile = job_profiles.create(job_description, title=data.get('title'))
+    return jsonify(job_profile_summary(profile_id, profile)), 201
+
+
+@app.route('/job-profiles/<profile_id>', methods=['GET', 'DELETE'])
+def job_profile(profile_id):
+    if request.method == 'DELETE':
+        if not job_profiles.delete(profile_id):
+            return jsonify({'error': 'Job profile not found'}), 404
+        return '', 204
+    
+    profile = job_profiles.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Job profile not found'}), 404
+    return jsonify(job_profile_summary(profile_id, profile))
+
+
+@app.route('/job-profiles/<profile_id>/rank', methods=['POST'])
+def rank_job_profile(profile_id):
+    profile = job_profiles.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Job profile not found'}), 404
+    
+    request.max_content_length = app.config['BATCH_MAX_CONTENT_LENGTH']
+    data = request.get_json(silent=True) or {}
+    resume_ids = data.get('resume_ids') or [
+        resume_id.strip()
+        for value in request.form.getlist('resume_ids')
+        for resume_id in value.split(',') if resume_id.strip()
+    ]
+    if not isinstance(resume_ids, list) or not all(isinstance(resume_id, str) for resume_id in resume_ids):
+        return jsonify({'error': 'resume_ids must be a list of strings'}), 400
+    files = request.files.getlist('resumes')
+    if not files and not resume_ids:
+        return jsonify({'error': 'No resumes or resume ids provided'}), 400
+    if len(files) + len(resume_ids) > app.config['BATCH_MAX_FILES']:
+        return jsonify({'error': f"Too many resumes (max {app.config['BATCH_MAX_FILES']})"}), 400
+    
+    try:
+        top_k = int(data.get('top_k') or request.form.get('top_k') or request.args.get('top_k') or 10)
+    except ValueError:
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    top_k = max(1, min(top_k, app.config['RANK_MAX_TOP_K']))
+    
+    try:
+        candidates, errors = load_candidate_profiles(files, resume_ids)
+        ranked = rank_candidates(profile, (
+            (
+                candidate['resume_id'],
+                candidate['text'],
+                candidate['profile']['skills']['skills'],
+                {'filename': candidate['filename'], 'name': candidate['profile']['personal_info']['name']}
+            )
+            for candidate in candidates
+        ), top_k=top_k)
+    except Exception as e:
+        logger.error(f"Error ranking resumes: {str(e)}", exc_info=True)
+        return jsonify({'error': f'An error occurred during ranking: {str(e)}'}), 500
+    
+    return jsonify({
+        'job_profile_id': profile_id,
+        'ranked': ranked,
+        'total_candidates': len(candidates),
+        'errors': errors
+    })
+
+
+@app.route('/candidates/search', methods=['GET', 'POST'])
+def search_candidates():
+    data = request.get_json(silent=True) or {}
+    skills = data.get('skills') or [
+        skill for value in request.args.getlist('skills') for skill in value.split(',')
+    ]
+    
+    # A job description or stored job profile is searched by its extracted keywords
+    profile = None
+    if data.get('job_profile_id') or request.args.get('job_profile_id'):
+        profile = job_profiles.get(data.get('job_profile_id') or request.args.get('job_profile_id'))
+        if profile is None:
+            return jsonify({'error': 'Job profile not found'}), 404
+    elif data.get('job_description'):
+        profile = compile_job_profile(data['job_description'])
+    if profile is not None:
+        skills = list(skills) + profile.keywords
+    
+    if not skills:
+        return jsonify({'error': 'No skills, job description or job profile provided'}), 400
+    
+    try:
+        limit = int(data.get('limit') or request.args.get('limit') or 50)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, app.config['CANDIDATE_SEARCH_MAX_LIMIT']))
+    
+    try:
+        results = candidate_store.search(skills, limit=limit)
+    except Exception as e:
+        logger.error(f"Error searching candidates: {str(e)}", exc_info=True)
+        return jsonify({'error': f'An error occurred during search: {str(e)}'}), 500
+    
+    return jsonify({'query': sorted({normalize_skill(skill) for skill in skills if skill.strip()}), 'candidates': results})
+
+
+@app.route('/candidates/<resume_id>')
+def get_candidate(resume_id):
+    candidate = candidate_store.get(resume_id)
+    if candidate is None:
+        return jsonify({'error': 'Candidate not found'}), 404
+    return jsonify(candidate)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,270 @@
+"""
+Synthetic resume, job description and taxonomy generator for the benchmarks
+
+Everything is derived from a seed, so the same arguments always produce the
+same corpus. PDF and DOCX files are written with the standard library only
+(uncompressed Helvetica PDFs and minimal WordprocessingML packages), so the
+corpus can be built offline without any document tooling installed.
+"""
+import argparse
+import json
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from analyzer import _default_skills_data
+
+LINES_PER_PAGE = 50
+
+_SYLLABLES = ["ka", "ro", "ven", "tal", "mi", "zor", "ex", "lum", "dra", "pi", "qua", "sen", "tor", "bex", "nal", "cy"]
+_SUFFIXES = ["db", "js", "ops", "ml", "flow", "stack", "cloud", "ql", "kit", "hub"]
+_FIRST_NAMES = ["Jane", "John", "Priya", "Wei", "Carlos", "Amara", "Olga", "Kenji", "Fatima", "Liam"]
+_LAST_NAMES = ["Doe", "Smith", "Patel", "Chen", "Garcia", "Okafor", "Ivanova", "Tanaka", "Hassan", "Murphy"]
+_COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises"]
+_TITLES = ["Software Engineer", "Data Scientist", "Web Developer", "Product Manager", "DevOps Engineer"]
+_SCHOOLS = ["Stanford University", "MIT", "University of Toronto", "Georgia Institute of Technology"]
+_VERBS = ["Built", "Designed", "Led", "Maintained", "Migrated", "Optimized", "Shipped", "Automated"]
+_OBJECTS = ["data pipelines", "a billing service", "internal dashboards", "the search backend",
+            "a recommendation engine", "CI/CD workflows", "customer onboarding", "reporting tools"]
+
+# Share of taxonomy entries per category when scaling past the built-in lists
+_CATEGORY_SHARES = [("technical_skills", 0.6), ("soft_skills", 0.2), ("certifications", 0.1), ("languages", 0.1)]
+
+
+def _synthetic_term(rng):
+    word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{word} {rng.choice(_SUFFIXES)}" if rng.random() < 0.4 else word
+
+
+def generate_skills_taxonomy(size, seed=0):
+    """
+    Build a skills.json-shaped taxonomy with size entries in total
+
+    The built-in terms come first (sampled down for small sizes); larger
+    taxonomies are padded with synthetic terms.
+    """
+    rng = random.Random(seed)
+    defaults = _default_skills_data()
+    taxonomy = {}
+    seen = set()
+    for category, share in _CATEGORY_SHARES:
+        wanted = max(1, round(size * share))
+        terms = defaults[category][:wanted]
+        seen.update(terms)
+        while len(terms) < wanted:
+            term = _synthetic_term(rng)
+            if term not in seen:
+                seen.add(term)
+                terms.append(term)
+        taxonomy[category] = terms
+    return taxonomy
+
+
+def generate_job_roles(skills_taxonomy, roles=None, seed=0):
+    """Build a job_roles.json-shaped catalog whose keywords come from the skills taxonomy"""
+    rng = random.Random(seed)
+    terms = skills_taxonomy["technical_skills"] + skills_taxonomy["soft_skills"]
+    roles = roles or max(1, len(terms) // 10)
+    return {
+        "job_roles": [
+            {"title": f"{rng.choice(_TITLES)} {index}", "keywords": rng.sample(terms, min(10, len(terms)))}
+            for index in range(roles)
+        ]
+    }
+
+
+def generate_resume(skills_taxonomy, pages=1, seed=0):
+    """
+    Generate the lines of a resume that fills roughly the given number of pages
+
+    Returns:
+        list: Text lines, with section headers the parsers recognise
+    """
+    rng = random.Random(seed)
+    technical = skills_taxonomy["technical_skills"]
+    soft = skills_taxonomy["soft_skills"]
+    name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        "",
+        "Summary",
+        f"{rng.choice(_TITLES)} with {rng.randint(2, 15)} years of experience in "
+        f"{rng.choice(technical)} and {rng.choice(technical)}.",
+        "",
+        "Skills",
+        ", ".join(rng.sample(technical, min(12, len(technical)))),
+        ", ".join(rng.sample(soft, min(5, len(soft)))),
+        "",
+        "Education",
+        f"Bachelor of Science in Computer Science, {rng.choice(_SCHOOLS)}, {rng.randint(1995, 2020)}",
+        f"Master of Science, {rng.choice(_SCHOOLS)}, {rng.randint(1998, 2022)}",
+        "",
+        "Experience",
+    ]
+
+    target = pages * LINES_PER_PAGE
+    year = 2024
+    while len(lines) < target - 2:
+        lines.append(f"{rng.choice(_TITLES)} at {rng.choice(_COMPANIES)}, {year - 3} - {year}")
+        year -= 3
+        for _ in range(rng.randint(3, 6)):
+            lines.append(
+                f"- {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} using {rng.choice(technical)} "
+                f"and {rng.choice(technical)}, with a focus on {rng.choice(soft)}."
+            )
+    lines.extend(["", "Projects", f"Open source contributor to {rng.choice(technical)} tooling."])
+    return lines
+
+
+def generate_job_description(skills_taxonomy, keywords=15, seed=0):
+    """Generate a job description with a requirements list drawn from the taxonomy"""
+    rng = random.Random(seed)
+    terms = skills_taxonomy["technical_skills"] + skills_taxonomy["soft_skills"]
+    picked = rng.sample(terms, min(keywords, len(terms)))
+    half = len(picked) // 2
+    lines = [
+        rng.choice(_TITLES),
+        "",
+        f"We are looking for an engineer to join {rng.choice(_COMPANIES)}.",
+        "Requirements:",
+    ]
+    lines.extend(f"- {term}" for term in picked[:half])
+    lines.append("")
+    lines.append("Experience with " + ", ".join(picked[half:]) + " is a plus.")
+    return "\n".join(lines)
+
+
+def _pdf_string(text):
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_pdf(lines, path):
+    """Write lines to an uncompressed PDF, LINES_PER_PAGE lines per page"""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    objects = [
+        None,  # catalog, filled in once the page ids are known
+        None,  # page tree
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page_lines in pages:
+        body = "BT /F1 10 Tf 14 TL 50 790 Td\n" + "\n".join(f"{_pdf_string(line)} Tj T*" for line in page_lines) + "\nET"
+        objects.append(f"<< /Length {len(body.encode('latin-1'))} >>\nstream\n{body}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def write_docx(lines, path):
+    """Write lines to a minimal DOCX package, one paragraph per line"""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' if line else "<w:p/>"
+        for line in lines
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{paragraphs}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        package.writestr("_rels/.rels", _DOCX_RELS)
+        package.writestr("word/document.xml", document)
+
+
+def build_corpus(out_dir, pages=(1, 5, 40), taxonomy_sizes=(10, 1000, 10000), seed=0):
+    """
+    Write a benchmark corpus to out_dir and return its manifest
+
+    For every taxonomy size there is a skills.json, a job_roles.json and a job
+    description; for every (page count, taxonomy size) pair a PDF and a DOCX
+    resume drawn from that taxonomy.
+
+    Returns:
+        dict: Manifest listing the generated files, also saved as manifest.json
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {"seed": seed, "taxonomies": {}, "resumes": []}
+
+    for size in taxonomy_sizes:
+        skills = generate_skills_taxonomy(size, seed)
+        roles = generate_job_roles(skills, seed=seed)
+        skills_path = os.path.join(out_dir, f"skills-{size}.json")
+        roles_path = os.path.join(out_dir, f"job_roles-{size}.json")
+        jd_path = os.path.join(out_dir, f"jd-{size}.txt")
+        with open(skills_path, "w") as f:
+            json.dump(skills, f)
+        with open(roles_path, "w") as f:
+            json.dump(roles, f)
+        with open(jd_path, "w") as f:
+            f.write(generate_job_description(skills, seed=seed))
+        manifest["taxonomies"][str(size)] = {"skills": skills_path, "job_roles": roles_path, "job_description": jd_path}
+
+        for page_count in pages:
+            lines = generate_resume(skills, page_count, seed=seed + page_count)
+            base = os.path.join(out_dir, f"resume-{page_count}p-{size}")
+            write_pdf(lines, base + ".pdf")
+            write_docx(lines, base + ".docx")
+            manifest["resumes"].append({
+                "pages": page_count, "taxonomy": size, "pdf": base + ".pdf", "docx": base + ".docx"
+            })
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume benchmark corpus")
+    parser.add_argument("out_dir", help="Directory to write the corpus to")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 40], help="Resume lengths in pages")
+    parser.add_argument("--taxonomy", type=int, nargs="+", default=[10, 1000, 10000], help="Skills taxonomy sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    manifest = build_corpus(args.out_dir, args.pages, args.taxonomy, args.seed)
+    print(f"Wrote {len(manifest['resumes'])} resumes to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Per-stage and end-to-end benchmarks over a synthetic resume corpus
+
+Usage:
+    python -m benchmarks.run --out results.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.2
+
+Each stage is timed for every (resume pages, taxonomy size) combination.
+Stats use pytest-benchmark's field names (min, max, mean, median, stddev,
+rounds) and comparisons are made on the median. Comparing against a
+baseline exits with status 1 when any stage got slower than the threshold.
+Keyword matching is checked against known cases before anything is timed,
+and a wrong answer also exits with status 1.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+import spacy
+
+from analyzer import SKILLS_DATA_PATH, _default_skills_data, _fallback_skills_data, extract_skills
+from benchmarks.corpus import build_corpus
+from job_matcher import (
+    JOB_ROLES_PATH, JobProfile, _default_job_roles, _fallback_job_roles, match_job_description, predict_job_role
+)
+from nlp_model import SPACY_MODEL
+from pipeline import analyze_document
+from resume_parser import extract_info, extract_text
+from sections import segment_sections
+from skill_matcher import KeywordMatcher, keyword_edge_pattern
+from taxonomy import registry as taxonomy_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.2
+# Differences below this many seconds are treated as noise, whatever the ratio
+DEFAULT_MIN_DELTA = 0.0005
+
+# (resume text, job description, expected match percentage); punctuated terms
+# such as c++ and c# must match even though \\b can't delimit them
+JOB_MATCH_CASES = [
+    ("Senior C++ and C# developer, Java expert.", "Requirements:\n- C++\n- C#\n- Java", 100),
+    ("JavaScript developer.", "Requirements:\n- Java", 0),
+]
+# (text, keywords, keywords expected to be found) for JD-style keyword matching
+KEYWORD_MATCH_CASES = [
+    ("built .net services in c# and c++.", ["c++", "c#", ".net", "net"], {"c++", "c#", ".net", "net"}),
+    ("javascript, c++11 and c#9", ["java", "c++", "c#"], {"c++", "c#"}),
+]
+
+
+def measure(func, rounds=5, warmup=1):
+    """Time func() rounds times after warmup untimed calls; return pytest-benchmark style stats"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": rounds
+    }
+
+
+def load_pipeline(name=SPACY_MODEL):
+    """Load the configured spaCy model, or a blank English pipeline when it isn't installed"""
+    try:
+        return spacy.load(name), name
+    except OSError:
+        logger.warning(f"spaCy model '{name}' is not installed, benchmarking a blank English pipeline")
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        return nlp, "blank:en"
+
+
+def use_taxonomy(paths):
+    """Point the skills and job role taxonomies at generated files"""
+    taxonomy_registry.register("skills", paths["skills"], _default_skills_data, _fallback_skills_data)
+    taxonomy_registry.register("job_roles", paths["job_roles"], _default_job_roles, _fallback_job_roles)
+
+
+def restore_taxonomy():
+    taxonomy_registry.register("skills", SKILLS_DATA_PATH, _default_skills_data, _fallback_skills_data)
+    taxonomy_registry.register("job_roles", JOB_ROLES_PATH, _default_job_roles, _fallback_job_roles)
+
+
+def check_keyword_matching():
+    """Return a message for every JOB_MATCH_CASES or KEYWORD_MATCH_CASES entry with an unexpected result"""
+    failures = []
+    for text, keywords, expected in KEYWORD_MATCH_CASES:
+        found = set(KeywordMatcher(keywords, word_boundary="edges").find_all(text))
+        by_regex = {keyword for keyword in keywords if re.search(keyword_edge_pattern(keyword), text)}
+        if found != expected or by_regex != expected:
+            failures.append(f"{text!r}: expected {sorted(expected)}, matcher found {sorted(found)}, regex {sorted(by_regex)}")
+    for resume_text, job_description, expected in JOB_MATCH_CASES:
+        result = match_job_description(resume_text, job_description, [])
+        if result["match_percentage"] != expected:
+            failures.append(
+                f"{resume_text!r} vs {job_description!r}: expected {expected}%, got {result['match_percentage']}% "
+                f"(matched {result['matched_keywords']})"
+            )
+    return failures
+
+
+def end_to_end(nlp, path, file_extension, job_description):
+    """Extract, parse and analyze one file the way /analyze does, without the cache"""
+    text = extract_text(path, file_extension)
+    return analyze_document(nlp(text), text, job_description)
+
+
+def benchmark_resume(nlp, resume, job_description, rounds):
+    """Time every analysis stage for one resume; returns {stage: stats}"""
+    text = extract_text(resume["pdf"], "pdf")
+    doc = nlp(text)
+    skills = extract_skills(doc, text)["skills"]
+
+    stages = {
+        "extract_text_pdf": lambda: extract_text(resume["pdf"], "pdf"),
+        "extract_text_docx": lambda: extract_text(resume["docx"], "docx"),
+        "segment_sections": lambda: segment_sections(text),
+        "nlp": lambda: nlp(text),
+        "extract_info": lambda: extract_info(doc, text),
+        "extract_skills": lambda: extract_skills(doc, text),
+        "compile_job_profile": lambda: JobProfile(job_description),
+        "match_job_description": lambda: match_job_description(text, job_description, skills),
+        "predict_job_role": lambda: predict_job_role(text, skills),
+        "end_to_end_pdf": lambda: end_to_end(nlp, resume["pdf"], "pdf", job_description),
+        "end_to_end_docx": lambda: end_to_end(nlp, resume["docx"], "docx", job_description),
+    }
+    return {stage: measure(func, rounds) for stage, func in stages.items()}
+
+
+def run(corpus_dir=None, pages=(1, 5, 40), taxonomy_sizes=(10, 1000, 10000), rounds=5, seed=0):
+    """
+    Build (or reuse) a corpus and benchmark every stage over it
+
+    Returns:
+        dict: {"meta": {...}, "benchmarks": [{"name", "stage", "pages", "taxonomy", "stats"}]}
+    """
+    nlp, model = load_pipeline()
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = build_corpus(corpus_dir or tmp, pages, taxonomy_sizes, seed)
+        results = []
+        try:
+            for resume in manifest["resumes"]:
+                paths = manifest["taxonomies"][str(resume["taxonomy"])]
+                use_taxonomy(paths)
+                with open(paths["job_description"]) as f:
+                    job_description = f.read()
+
+                for stage, stats in benchmark_resume(nlp, resume, job_description, rounds).items():
+                    name = f"{stage}[pages={resume['pages']},taxonomy={resume['taxonomy']}]"
+                    results.append({
+                        "name": name, "stage": stage, "pages": resume["pages"], "taxonomy": resume["taxonomy"],
+                        "stats": stats
+                    })
+                    print(f"{name:<60} median {stats['median'] * 1000:10.3f} ms", file=sys.stderr)
+        finally:
+            restore_taxonomy()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spacy": spacy.__version__,
+            "model": model,
+            "seed": seed,
+            "rounds": rounds,
+            "created_at": time.time()
+        },
+        "benchmarks": results
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """
+    Compare median timings against a baseline
+
+    Args:
+        results (dict): Output of run()
+        baseline (dict): Earlier output of run()
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%
+        min_delta (float): Slowdowns smaller than this many seconds are ignored
+
+    Returns:
+        list: One row per benchmark present in both, with baseline, current,
+            ratio and regression flag
+    """
+    if baseline.get("meta", {}).get("model") != results["meta"]["model"]:
+        logger.warning(
+            f"Baseline was recorded with model {baseline.get('meta', {}).get('model')}, "
+            f"current run uses {results['meta']['model']}; nlp timings are not comparable"
+        )
+    previous = {entry["name"]: entry["stats"]["median"] for entry in baseline.get("benchmarks", [])}
+    rows = []
+    for entry in results["benchmarks"]:
+        if entry["name"] not in previous:
+            continue
+        before = previous[entry["name"]]
+        after = entry["stats"]["median"]
+        ratio = after / before if before > 0 else float("inf")
+        rows.append({
+            "name": entry["name"],
+            "baseline": before,
+            "current": after,
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold and after - before > min_delta
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark resume analysis stages")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 40], help="Resume lengths in pages")
+    parser.add_argument("--taxonomy", type=int, nargs="+", default=[10, 1000, 10000], help="Skills taxonomy sizes")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed calls per stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Keep the generated corpus in this directory")
+    parser.add_argument("--out", help="Write results JSON to this file")
+    parser.add_argument("--save-baseline", help="Write results JSON to this baseline file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative slowdown of the median before failing (default 0.2)")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    failures = check_keyword_matching()
+    for failure in failures:
+        print(f"Keyword matching check failed: {failure}", file=sys.stderr)
+    if failures:
+        return 1
+
+    results = run(args.corpus, args.pages, args.taxonomy, args.rounds, args.seed)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold, args.min_delta)
+    if not rows:
+        print(f"No benchmarks in common with {args.compare}; nothing was compared", file=sys.stderr)
+        return 1
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<60} {row['baseline'] * 1000:10.3f} ms -> {row['current'] * 1000:10.3f} ms "
+            f"({row['ratio']:.2f}x) {flag}"
+        )
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{len(rows)} benchmarks compared, {len(regressions)} regressions (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data):
+    """Return the hex SHA-256 digest of uploaded file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_hash_stream(stream, chunk_size=64 * 1024):
+    """Return the hex SHA-256 digest of a seekable file object, leaving it rewound"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache of analysis results keyed by content hash
+
+    A bounded in-memory LRU sits in front of a SQLite file. The SQLite tier
+    survives restarts and is shared by every worker process pointing at the
+    same path; each operation opens its own short-lived connection so the
+    cache is safe to use after fork. Hit and miss counts are per process.
+    """
+
+    def __init__(self, path, max_entries=256, max_disk_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS analysis_cache_accessed ON analysis_cache (accessed_at)")
+        except sqlite3.Error as e:
+            logger.error(f"Error initializing analysis cache at {self.path}: {str(e)}")
+
+    def get(self, key):
+        """
+        Look up a cached value
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+        value = None
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE analysis_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    value = json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error reading analysis cache: {str(e)}")
+
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """
+        Store a JSON-serializable value in both tiers
+
+        Args:
+            key (str): Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._remember(key, value)
+            self._puts += 1
+            prune = self._puts % 100 == 0
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, value, accessed_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time())
+                )
+                if prune:
+                    conn.execute(
+                        "DELETE FROM analysis_cache WHERE key IN ("
+                        "SELECT key FROM analysis_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_disk_entries,)
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing analysis cache: {str(e)}")
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counters and the in-memory tier size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,209 @@
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import Float, ForeignKey, Index, Integer, JSON, String, create_engine, delete, func, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+logger = logging.getLogger(__name__)
+
+# Skill categories from extract_skills() that feed the inverted index
+INDEXED_SKILL_KEYS = ["skills", "technical", "soft", "certifications", "languages"]
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Candidate(Base):
+    """An analyzed resume, keyed by the content hash of the uploaded file"""
+
+    __tablename__ = "candidates"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    resume_id: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    filename: Mapped[str] = mapped_column(String(255), nullable=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=True)
+    email: Mapped[str] = mapped_column(String(255), nullable=True)
+    phone: Mapped[str] = mapped_column(String(64), nullable=True)
+    skills: Mapped[dict] = mapped_column(JSON)
+    roles: Mapped[list] = mapped_column(JSON)
+    education: Mapped[list] = mapped_column(JSON)
+    experience: Mapped[list] = mapped_column(JSON)
+    skill_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[float] = mapped_column(Float)
+    updated_at: Mapped[float] = mapped_column(Float)
+
+    def to_dict(self):
+        return {
+            "resume_id": self.resume_id,
+            "filename": self.filename,
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "skills": self.skills,
+            "roles": self.roles,
+            "education": self.education,
+            "experience": self.experience,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class CandidateSkill(Base):
+    """Inverted index posting: one row per (skill, candidate)"""
+
+    __tablename__ = "candidate_skills"
+
+    skill: Mapped[str] = mapped_column(String(255), primary_key=True)
+    candidate_id: Mapped[int] = mapped_column(ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (Index("candidate_skills_candidate", "candidate_id"),)
+
+
+def normalize_skill(skill):
+    return " ".join(skill.lower().split())
+
+
+def indexed_skills(skills_data):
+    """Return the set of normalized skills from an extract_skills() result"""
+    skills = set()
+    for key in INDEXED_SKILL_KEYS:
+        for skill in skills_data.get(key, []):
+            skill = normalize_skill(skill)
+            if skill and len(skill) <= 255:
+                skills.add(skill)
+    return skills
+
+
+class CandidateStore:
+    """
+    Persists analyzed candidates and answers top-k skill queries from an inverted index
+
+    Uses a pooled SQLAlchemy engine (SQLite locally, PostgreSQL via
+    DATABASE_URL in production). The engine is created lazily per process so
+    pooled connections are never shared across a fork.
+    """
+
+    def __init__(self, database_url, pool_size=5, max_overflow=10):
+        self.database_url = database_url
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self._engine = None
+        self._engine_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        with self._lock:
+            if self._engine is None or self._engine_pid != os.getpid():
+                options = {"pool_pre_ping": True}
+                if not self.database_url.startswith("sqlite"):
+                    options.update(pool_size=self.pool_size, max_overflow=self.max_overflow, pool_recycle=300)
+                self._engine = create_engine(self.database_url, **options)
+                self._engine_pid = os.getpid()
+                Base.metadata.create_all(self._engine)
+            return self._engine
+
+    def save(self, resume_id, analysis, filename=None):
+        """
+        Insert or update a candidate and its skill postings
+
+        Args:
+            resume_id (str): Content hash of the resume file
+            analysis (dict): Result with personal_info, skills and job_role_prediction
+            filename (str): Original upload name
+        """
+        info = analysis.get("personal_info", {})
+        skills_data = analysis.get("skills", {})
+        roles = analysis.get("job_role_prediction", {}).get("top_roles", [])
+        skills = indexed_skills(skills_data)
+        now = time.time()
+
+        with Session(self.engine) as session, session.begin():
+            candidate = session.scalar(select(Candidate).where(Candidate.resume_id == resume_id))
+            if candidate is None:
+                candidate = Candidate(resume_id=resume_id, created_at=now)
+                session.add(candidate)
+            candidate.filename = filename or candidate.filename
+            candidate.name = info.get("name")
+            candidate.email = info.get("email")
+            candidate.phone = info.get("phone")
+            candidate.skills = {key: skills_data.get(key, []) for key in INDEXED_SKILL_KEYS}
+            candidate.roles = [{"title": role["title"], "score": role["score"]} for role in roles]
+            candidate.education = info.get("education", [])
+            candidate.experience = info.get("experience", [])
+            candidate.skill_count = len(skills)
+            candidate.updated_at = now
+            session.flush()
+
+            session.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id == candidate.id))
+            if skills:
+                session.add_all(CandidateSkill(skill=skill, candidate_id=candidate.id) for skill in skills)
+
+    def get(self, resume_id):
+        """Return a stored candidate as a dict, or None"""
+        with Session(self.engine) as session:
+            candidate = session.scalar(select(Candidate).where(Candidate.resume_id == resume_id))
+            return candidate.to_dict() if candidate is not None else None
+
+    def search(self, skills, limit=50):
+        """
+        Find the candidates matching the most of the given skills
+
+        Only the postings of the requested skills are read (via the
+        candidate_skills primary key index), never the whole candidate table.
+
+        Args:
+            skills (iterable): Skills or JD keywords to match
+            limit (int): Number of candidates to return
+
+        Returns:
+            list: Candidate summaries with match_count, match_percentage and matched_skills
+        """
+        wanted = sorted({normalize_skill(skill) for skill in skills if skill and skill.strip()})
+        if not wanted:
+            return []
+
+        with Session(self.engine) as session:
+            hits = func.count(CandidateSkill.skill).label("hits")
+            top = session.execute(
+                select(CandidateSkill.candidate_id, hits)
+                .where(CandidateSkill.skill.in_(wanted))
+                .group_by(CandidateSkill.candidate_id)
+                .order_by(hits.desc(), CandidateSkill.candidate_id)
+                .limit(limit)
+            ).all()
+            if not top:
+                return []
+
+            candidate_ids = [candidate_id for candidate_id, _ in top]
+            candidates = {
+                candidate.id: candidate
+                for candidate in session.scalars(select(Candidate).where(Candidate.id.in_(candidate_ids)))
+            }
+            matched = {}
+            for candidate_id, skill in session.execute(
+                select(CandidateSkill.candidate_id, CandidateSkill.skill)
+                .where(CandidateSkill.candidate_id.in_(candidate_ids), CandidateSkill.skill.in_(wanted))
+            ):
+                matched.setdefault(candidate_id, []).append(skill)
+
+            results = []
+            for candidate_id, count in top:
+                candidate = candidates[candidate_id]
+                results.append({
+                    "resume_id": candidate.resume_id,
+                    "filename": candidate.filename,
+                    "name": candidate.name,
+                    "roles": candidate.roles,
+                    "match_count": count,
+                    "match_percentage": round((count / len(wanted)) * 100),
+                    "matched_skills": sorted(matched.get(candidate_id, []))
+                })
+            return results
+
+    def count(self):
+        with Session(self.engine) as session:
+            return session.scalar(select(func.count(Candidate.id)))
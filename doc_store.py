@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from spacy.tokens import DocBin
+
+logger = logging.getLogger(__name__)
+
+
+def doc_to_bytes(doc):
+    """Serialize one parsed Doc in compact DocBin form"""
+    doc_bin = DocBin(store_user_data=False)
+    doc_bin.add(doc)
+    return doc_bin.to_bytes()
+
+
+def doc_from_bytes(data, vocab):
+    """Restore a Doc serialized by doc_to_bytes() against the pipeline's vocab"""
+    return next(DocBin().from_bytes(data).get_docs(vocab))
+
+
+class StoredResume:
+    """One row of the doc store"""
+
+    def __init__(self, resume_id, filename, text, doc_bytes, profile, taxonomy_tag):
+        self.resume_id = resume_id
+        self.filename = filename
+        self.text = text
+        self.doc_bytes = doc_bytes
+        self.profile = profile
+        self.taxonomy_tag = taxonomy_tag
+
+
+def stored_resume(row):
+    """Build a StoredResume from a (resume_id, filename, text, doc, profile, taxonomy_tag) row"""
+    return StoredResume(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5])
+
+
+class DocStore:
+    """
+    Parsed resumes kept for re-scoring after taxonomy changes
+
+    Each resume is stored with its extracted text, its spaCy Doc as DocBin
+    bytes and the profile computed from them, tagged with the taxonomy
+    versions that profile was computed under. A snapshot of the taxonomies
+    is kept for every tag, so a re-score can tell which skill terms changed
+    since a profile was computed. Like the analysis cache this is a SQLite
+    file shared by all worker processes, opened per operation.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Taxonomy tags whose snapshot this process has already saved
+        self._snapshot_tags = set()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parsed_docs ("
+                "resume_id TEXT PRIMARY KEY, filename TEXT, text TEXT NOT NULL, doc BLOB, "
+                "profile TEXT NOT NULL, taxonomy_tag TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS parsed_docs_tag ON parsed_docs (taxonomy_tag)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS taxonomy_snapshots ("
+                "tag TEXT PRIMARY KEY, data TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def ensure_snapshot(self, tag, taxonomies):
+        """
+        Save the taxonomies behind a tag, once per tag and process
+
+        Args:
+            tag (str): Taxonomy cache tag
+            taxonomies (callable): Returns {name: data} for the loaded taxonomies
+        """
+        with self._lock:
+            if tag in self._snapshot_tags:
+                return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO taxonomy_snapshots (tag, data, created_at) VALUES (?, ?, ?)",
+                (tag, json.dumps(taxonomies()), time.time())
+            )
+        with self._lock:
+            self._snapshot_tags.add(tag)
+
+    def snapshot(self, tag):
+        """Return the taxonomies saved for a tag, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM taxonomy_snapshots WHERE tag = ?", (tag,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def save(self, resume_id, text, doc, profile, taxonomy_tag, filename=None):
+        """
+        Store a resume's text, parsed Doc and profile
+
+        Args:
+            resume_id (str): Content hash of the resume file
+            text (str): Extracted text the Doc was parsed from
+            doc (spacy.tokens.Doc): Parsed Doc, or None when the profile was
+                derived without parsing (e.g. from a near duplicate)
+            profile (dict): Result of analyze_profile()
+            taxonomy_tag (str): Taxonomy versions the profile was computed under
+            filename (str): Original upload name
+        """
+        doc_bytes = doc_to_bytes(doc) if doc is not None else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO parsed_docs (resume_id, filename, text, doc, profile, taxonomy_tag, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (resume_id) DO UPDATE SET filename = COALESCE(excluded.filename, filename), "
+                "text = excluded.text, doc = COALESCE(excluded.doc, doc), profile = excluded.profile, "
+                "taxonomy_tag = excluded.taxonomy_tag, updated_at = excluded.updated_at",
+                (resume_id, filename, text, doc_bytes, json.dumps(profile), taxonomy_tag, time.time())
+            )
+
+    def count_stale(self, taxonomy_tag):
+        """Return the number of resumes whose profile was computed under another taxonomy tag"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM parsed_docs WHERE taxonomy_tag != ?", (taxonomy_tag,)).fetchone()[0]
+
+    def iter_stale(self, taxonomy_tag, batch_size=100):
+        """
+        Yield the resumes whose profile was computed under another taxonomy tag, in batches
+
+        All rows come from one query on one connection, read batch_size rows
+        at a time, so a re-score makes a single round trip per batch instead
+        of one per resume. The read sees a consistent WAL snapshot, so
+        profiles written back while iterating don't disturb it.
+
+        Args:
+            taxonomy_tag (str): Current taxonomy cache tag
+            batch_size (int): Rows fetched per batch
+
+        Yields:
+            list: StoredResume objects, ordered by resume id
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT resume_id, filename, text, doc, profile, taxonomy_tag FROM parsed_docs "
+                "WHERE taxonomy_tag != ? ORDER BY resume_id",
+                (taxonomy_tag,)
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [stored_resume(row) for row in rows]
+        finally:
+            conn.close()
+
+    def get(self, resume_id):
+        """Return a StoredResume, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT resume_id, filename, text, doc, profile, taxonomy_tag FROM parsed_docs WHERE resume_id = ?",
+                (resume_id,)
+            ).fetchone()
+        return stored_resume(row) if row is not None else None
+
+    def update_profiles(self, updates):
+        """
+        Replace the profiles of several resumes
+
+        Args:
+            updates (list): (resume_id, profile, taxonomy_tag) tuples
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE parsed_docs SET profile = ?, taxonomy_tag = ?, updated_at = ? WHERE resume_id = ?",
+                [(json.dumps(profile), tag, now, resume_id) for resume_id, profile, tag in updates]
+            )
+
+    def stats(self):
+        """Return counts of stored resumes, by taxonomy tag"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT taxonomy_tag, COUNT(*), SUM(LENGTH(doc)) FROM parsed_docs GROUP BY taxonomy_tag"
+            ).fetchall()
+        return {
+            "resumes": sum(count for _, count, _ in rows),
+            "doc_bytes": sum(size or 0 for _, _, size in rows),
+            "by_taxonomy": {tag: count for tag, count, _ in rows}
+        }
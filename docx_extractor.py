@@ -0,0 +1,137 @@
+import logging
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# Extraction limits; all can be overridden through the environment
+DOCX_MAX_XML_BYTES = int(os.environ.get("DOCX_MAX_XML_BYTES", str(50 * 1024 * 1024)))
+DOCX_MAX_RATIO = float(os.environ.get("DOCX_MAX_RATIO", "100"))
+# Parts smaller than this are never rejected for their compression ratio
+DOCX_RATIO_MIN_BYTES = int(os.environ.get("DOCX_RATIO_MIN_BYTES", str(1024 * 1024)))
+DOCX_READ_CHUNK = 64 * 1024
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PARAGRAPH = _W + "p"
+_TEXT = _W + "t"
+_TAB = _W + "tab"
+_BREAKS = (_W + "br", _W + "cr")
+
+_header_pattern = re.compile(r"word/header[0-9]*\.xml$")
+_footer_pattern = re.compile(r"word/footer[0-9]*\.xml$")
+
+
+class DocxLimitError(Exception):
+    """Raised when a DOCX package exceeds a size or compression-ratio limit"""
+
+
+def text_parts(package):
+    """
+    Return the XML parts that hold resume text, in reading order
+
+    Headers come first and footers last, as docx2txt orders them. Media and
+    every other part of the package are never opened.
+    """
+    names = package.namelist()
+    if "word/document.xml" not in names:
+        raise ValueError("Not a Word document: word/document.xml is missing")
+    return (
+        [package.getinfo(name) for name in names if _header_pattern.match(name)]
+        + [package.getinfo("word/document.xml")]
+        + [package.getinfo(name) for name in names if _footer_pattern.match(name)]
+    )
+
+
+def check_ratio(info, size):
+    if size >= DOCX_RATIO_MIN_BYTES and size > DOCX_MAX_RATIO * max(info.compress_size, 1):
+        raise DocxLimitError(f"{info.filename} expands more than {DOCX_MAX_RATIO:g}x")
+
+
+def stream_part_text(package, info, budget, pieces):
+    """
+    Append the text of one WordprocessingML part to pieces, parsing it incrementally
+
+    Mirrors docx2txt: every paragraph starts with a blank line, tabs and
+    line breaks are kept. Elements are detached from the tree as soon as
+    they end, so memory stays proportional to the nesting depth, not to
+    the size of the part.
+
+    Args:
+        package (zipfile.ZipFile): Open DOCX package
+        info (zipfile.ZipInfo): Part to read
+        budget (int): Decompressed bytes still allowed for this document
+        pieces (list): Output list of text fragments
+
+    Returns:
+        int: Decompressed bytes read
+    """
+    # Sizes in the central directory can't be trusted, so they are checked
+    # up front and the bytes actually inflated are counted again below
+    if info.file_size > budget:
+        raise DocxLimitError(f"{info.filename} is larger than {DOCX_MAX_XML_BYTES} bytes uncompressed")
+    check_ratio(info, info.file_size)
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    fragments = []
+    read = 0
+
+    def handle_events():
+        for event, elem in parser.read_events():
+            if event == "start":
+                if elem.tag == _PARAGRAPH:
+                    fragments.append("\n\n")
+                elif elem.tag == _TAB:
+                    fragments.append("\t")
+                elif elem.tag in _BREAKS:
+                    fragments.append("\n")
+                stack.append(elem)
+            else:
+                if elem.tag == _TEXT and elem.text:
+                    fragments.append(elem.text)
+                stack.pop()
+                if stack:
+                    stack[-1].remove(elem)
+        # One string per chunk rather than thousands of small ones
+        if fragments:
+            pieces.append("".join(fragments))
+            fragments.clear()
+
+    with package.open(info) as part:
+        while True:
+            chunk = part.read(DOCX_READ_CHUNK)
+            if not chunk:
+                break
+            read += len(chunk)
+            if read > budget:
+                raise DocxLimitError(f"{info.filename} is larger than {DOCX_MAX_XML_BYTES} bytes uncompressed")
+            check_ratio(info, read)
+            parser.feed(chunk)
+            handle_events()
+    parser.close()
+    handle_events()
+    return read
+
+
+def extract_docx(file):
+    """
+    Extract the text of a DOCX resume without loading whole parts into memory
+
+    Args:
+        file (str or file object): Path to the DOCX file, or a seekable binary file object
+
+    Returns:
+        str: Text of headers, body and footers, stripped
+
+    Raises:
+        DocxLimitError: If the text parts inflate beyond DOCX_MAX_XML_BYTES
+            or DOCX_MAX_RATIO times their compressed size
+    """
+    pieces = []
+    budget = DOCX_MAX_XML_BYTES
+    with zipfile.ZipFile(file) as package:
+        for info in text_parts(package):
+            budget -= stream_part_text(package, info, budget, pieces)
+    return "".join(pieces).strip()
@@ -0,0 +1,48 @@
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+
+# Threaded workers: analyses are capped per worker by the admission controller
+# (ANALYSIS_WORKERS), so the spare threads keep serving pages, health checks and
+# /metrics under load. A short backlog makes excess connections fail fast
+# instead of queueing unseen in the kernel.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+backlog = int(os.environ.get("GUNICORN_BACKLOG", "64"))
+
+# Import the app (and with it the spaCy model and compiled taxonomies) once in
+# the master; workers are forked from it and share that memory copy-on-write.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+wsgi_app = "main:app"
+
+
+def on_starting(server):
+    # Worker metric snapshots from a previous run would otherwise be added to the new totals
+    from metrics import clear_snapshots
+    clear_snapshots()
+
+
+def when_ready(server):
+    # Move everything loaded so far into the permanent generation so the
+    # garbage collector in each worker doesn't touch (and copy) those pages
+    if preload_app:
+        gc.freeze()
+        server.log.info("Preloaded app; %d objects frozen for copy-on-write sharing", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    from memory import set_memory_limit
+    set_memory_limit()
+    if preload_app:
+        server.log.info("Worker %s forked from preloaded master", worker.pid)
+
+
+def post_worker_init(worker):
+    # Jobs left queued or abandoned by a previous run are picked up at boot,
+    # not only once this worker receives a new job
+    from app import job_workers
+    job_workers.ensure_started()
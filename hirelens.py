@@ -0,0 +1,224 @@
+"""
+Command line entry point for offline resume analysis
+
+    python -m hirelens analyze resumes/ --jd job.txt --jobs 8 --out results.jsonl
+
+Resumes are analyzed in a process pool and each result is appended to the
+JSONL output as soon as it finishes. Every finished file is also recorded in
+a checkpoint file together with the output size after its line, so a run
+that crashed or was interrupted can be started again with the same command:
+finished files are skipped and any partly written output is cut off.
+"""
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import pdf_extractor
+from cache import content_hash
+from nlp_model import ModelNotAvailableError, limit_text, load_model, parse_text
+from pipeline import analyze_document
+from resume_parser import extract_text
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+
+_nlp = None
+_job_description = ''
+
+
+def find_resumes(inputs):
+    """
+    Expand directories (recursively) and glob patterns into a sorted list of resume paths
+
+    Args:
+        inputs (list): Directories, files or glob patterns
+
+    Returns:
+        list: Absolute paths of PDF and DOCX files, without duplicates
+    """
+    paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '**', '*'), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in matches:
+            if os.path.isfile(path) and path.rsplit('.', 1)[-1].lower() in ALLOWED_EXTENSIONS:
+                paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Read a checkpoint file
+
+    Returns:
+        tuple: (set of finished paths, output size in bytes covered by the checkpoint)
+    """
+    done = set()
+    offset = 0
+    if not os.path.exists(checkpoint_path):
+        return done, offset
+    valid = []
+    with open(checkpoint_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; everything after it is redone
+                break
+            valid.append(line)
+            done.add(entry['file'])
+            offset = max(offset, entry['offset'])
+    # Rewrite without the broken tail so new entries aren't appended to it
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.writelines(valid)
+    os.replace(tmp_path, checkpoint_path)
+    return done, offset
+
+
+def _init_worker(job_description):
+    global _nlp, _job_description
+    _job_description = job_description
+    # Pool workers can't start their own page-extraction pools; the CLI pool already parallelizes
+    pdf_extractor.PDF_WORKERS = 1
+    if _nlp is None:
+        _nlp = load_model()
+
+
+def analyze_file(path):
+    """
+    Analyze one resume file in a worker process
+
+    Returns:
+        dict: {"file", "resume_id", "result"} or {"file", "error"}
+    """
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            resume_id = content_hash(f.read())
+        text = extract_text(path, path.rsplit('.', 1)[-1].lower())
+        if not text:
+            return {'file': path, 'error': 'Could not extract text from the resume'}
+        text, truncated_by = limit_text(_nlp, text)
+        result = analyze_document(parse_text(_nlp, text), text, _job_description)
+        entry = {'file': path, 'resume_id': resume_id, 'result': result}
+        if truncated_by is not None:
+            entry['truncated_by'] = truncated_by
+        entry['seconds'] = round(time.perf_counter() - started, 3)
+        return entry
+    except Exception as e:
+        logger.error(f"Error analyzing {path}: {str(e)}")
+        return {'file': path, 'error': f'An error occurred during analysis: {str(e)}'}
+
+
+def analyze(inputs, out_path, job_description='', jobs=None, checkpoint_path=None, chunksize=4, overwrite=False):
+    """
+    Analyze every resume under inputs into a JSONL file, resuming from a checkpoint
+
+    Args:
+        inputs (list): Directories, files or glob patterns
+        out_path (str): JSONL output file; appended to when resuming
+        job_description (str): Optional job description to match every resume against
+        jobs (int): Worker processes, one per CPU by default
+        checkpoint_path (str): Checkpoint file, out_path + ".checkpoint" by default
+        chunksize (int): Files handed to a worker at a time
+        overwrite (bool): Start over, replacing an existing output file and checkpoint
+
+    Returns:
+        dict: Counts of analyzed, failed and skipped files
+
+    Raises:
+        FileExistsError: If out_path already has content that no checkpoint
+            accounts for and overwrite isn't set
+    """
+    global _nlp
+    checkpoint_path = checkpoint_path or out_path + '.checkpoint'
+    jobs = jobs or os.cpu_count() or 1
+
+    paths = find_resumes(inputs)
+    if overwrite and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    done, offset = load_checkpoint(checkpoint_path)
+    if not done and not overwrite and os.path.exists(out_path) and os.path.getsize(out_path) > 0:
+        # Without a checkpoint there is nothing to resume, and truncating would wipe someone else's file
+        raise FileExistsError(f"{out_path} already exists and has no checkpoint; pass --overwrite to replace it")
+    pending = [path for path in paths if path not in done]
+    logger.info(f"{len(paths)} resumes found, {len(paths) - len(pending)} already done, {len(pending)} to analyze")
+
+    # Drop output written after the last checkpointed result
+    mode = 'r+b' if os.path.exists(out_path) else 'wb'
+    out = open(out_path, mode)
+    out.truncate(offset)
+    out.seek(offset)
+    checkpoint = open(checkpoint_path, 'a')
+
+    # Load the model once here: forked workers inherit it, and a missing model fails fast
+    _nlp = load_model()
+
+    counts = {'analyzed': 0, 'failed': 0, 'skipped': len(paths) - len(pending)}
+    started = time.perf_counter()
+    try:
+        with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(job_description,)) as pool:
+            for entry in pool.imap_unordered(analyze_file, pending, chunksize=chunksize):
+                out.write(json.dumps(entry).encode('utf-8') + b'\n')
+                out.flush()
+                checkpoint.write(json.dumps({'file': entry['file'], 'offset': out.tell()}) + '\n')
+                checkpoint.flush()
+
+                counts['failed' if 'error' in entry else 'analyzed'] += 1
+                finished = counts['analyzed'] + counts['failed']
+                if finished % 100 == 0 or finished == len(pending):
+                    rate = finished / max(time.perf_counter() - started, 1e-9)
+                    logger.info(f"{finished}/{len(pending)} resumes analyzed ({rate:.1f}/s)")
+    finally:
+        out.close()
+        checkpoint.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='hirelens', description='Offline resume analysis')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analyze_parser = commands.add_parser('analyze', help='Analyze resumes into a JSONL file')
+    analyze_parser.add_argument('inputs', nargs='+', help='Directories, files or glob patterns of PDF/DOCX resumes')
+    analyze_parser.add_argument('--jd', help='Job description text file to match every resume against')
+    analyze_parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: one per CPU)')
+    analyze_parser.add_argument('--out', required=True, help='JSONL output file')
+    analyze_parser.add_argument('--checkpoint', help='Checkpoint file (default: <out>.checkpoint)')
+    analyze_parser.add_argument('--chunksize', type=int, default=4, help='Files handed to a worker at a time')
+    analyze_parser.add_argument('--overwrite', action='store_true',
+                                help='Replace an existing output file instead of resuming from its checkpoint')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    job_description = ''
+    if args.jd:
+        with open(args.jd) as f:
+            job_description = f.read()
+
+    try:
+        counts = analyze(
+            args.inputs, args.out, job_description, args.jobs, args.checkpoint, args.chunksize, args.overwrite
+        )
+    except (ModelNotAvailableError, FileExistsError) as e:
+        logger.error(str(e))
+        return 2
+    except KeyboardInterrupt:
+        logger.info("Interrupted; run the same command again to resume")
+        return 130
+    logger.info(f"Done: {counts['analyzed']} analyzed, {counts['failed']} failed, {counts['skipped']} skipped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,68 +1,77 @@
+import heapq
 import logging
-import json
 import os
 import re
 from collections import Counter
+from functools import lru_cache
+
+from skill_matcher import KeywordMatcher, keyword_edge_pattern
+from taxonomy import registry as taxonomy_registry
 
 logger = logging.getLogger(__name__)
 
 # Load job roles data
 JOB_ROLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'data', 'job_roles.json')
 
-def load_job_roles():
-    try:
-        if os.path.exists(JOB_ROLES_PATH):
-            with open(JOB_ROLES_PATH, 'r') as f:
-                return json.load(f)
-        else:
-            # Return default job roles data if file doesn't exist
-            return {
-                "job_roles": [
-                    {
-                        "title": "Software Engineer",
-                        "keywords": ["software", "developer", "programming", "coding", "java", "python", "javascript", "c++", "algorithms", "data structures"]
-                    },
-                    {
-                        "title": "Data Scientist",
-                        "keywords": ["data science", "machine learning", "statistics", "python", "r", "ai", "deep learning", "analytics", "data mining", "big data"]
-                    },
-                    {
-                        "title": "Web Developer",
-                        "keywords": ["web", "frontend", "backend", "full-stack", "html", "css", "javascript", "react", "angular", "vue", "node.js", "php"]
-                    },
-                    {
-                        "title": "Product Manager",
-                        "keywords": ["product", "management", "agile", "scrum", "roadmap", "strategy", "user stories", "prioritization", "requirements", "stakeholders"]
-                    },
-                    {
-                        "title": "UX/UI Designer",
-                        "keywords": ["ux", "ui", "user experience", "user interface", "design", "wireframes", "prototypes", "usability", "figma", "sketch", "adobe xd"]
-                    },
-                    {
-                        "title": "DevOps Engineer",
-                        "keywords": ["devops", "ci/cd", "continuous integration", "deployment", "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "terraform"]
-                    },
-                    {
-                        "title": "Business Analyst",
-                        "keywords": ["business analysis", "requirements", "stakeholders", "process", "documentation", "sql", "data analysis", "reporting", "visualization"]
-                    },
-                    {
-                        "title": "Project Manager",
-                        "keywords": ["project management", "pmp", "agile", "scrum", "waterfall", "budget", "timeline", "resources", "risk management", "planning"]
-                    },
-                    {
-                        "title": "Marketing Specialist",
-                        "keywords": ["marketing", "digital marketing", "seo", "sem", "social media", "content", "campaigns", "analytics", "brand", "strategy"]
-                    },
-                    {
-                        "title": "Sales Representative",
-                        "keywords": ["sales", "business development", "account management", "negotiation", "client", "customer", "crm", "pipeline", "quota", "closing"]
-                    }
-                ]
+def _default_job_roles():
+    """Default job roles data used when job_roles.json doesn't exist"""
+    return {
+        "job_roles": [
+            {
+                "title": "Software Engineer",
+                "keywords": ["software", "developer", "programming", "coding", "java", "python", "javascript", "c++", "algorithms", "data structures"]
+            },
+            {
+                "title": "Data Scientist",
+                "keywords": ["data science", "machine learning", "statistics", "python", "r", "ai", "deep learning", "analytics", "data mining", "big data"]
+            },
+            {
+                "title": "Web Developer",
+                "keywords": ["web", "frontend", "backend", "full-stack", "html", "css", "javascript", "react", "angular", "vue", "node.js", "php"]
+            },
+            {
+                "title": "Product Manager",
+                "keywords": ["product", "management", "agile", "scrum", "roadmap", "strategy", "user stories", "prioritization", "requirements", "stakeholders"]
+            },
+            {
+                "title": "UX/UI Designer",
+                "keywords": ["ux", "ui", "user experience", "user interface", "design", "wireframes", "prototypes", "usability", "figma", "sketch", "adobe xd"]
+            },
+            {
+                "title": "DevOps Engineer",
+                "keywords": ["devops", "ci/cd", "continuous integration", "deployment", "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "terraform"]
+            },
+            {
+                "title": "Business Analyst",
+                "keywords": ["business analysis", "requirements", "stakeholders", "process", "documentation", "sql", "data analysis", "reporting", "visualization"]
+            },
+            {
+                "title": "Project Manager",
+                "keywords": ["project management", "pmp", "agile", "scrum", "waterfall", "budget", "timeline", "resources", "risk management", "planning"]
+            },
+            {
+                "title": "Marketing Specialist",
+                "keywords": ["marketing", "digital marketing", "seo", "sem", "social media", "content", "campaigns", "analytics", "brand", "strategy"]
+            },
+            {
+                "title": "Sales Representative",
+                "keywords": ["sales", "business development", "account management", "negotiation", "client", "customer", "crm", "pipeline", "quota", "closing"]
             }
-    except Exception as e:
-        logger.error(f"Error loading job roles data: {str(e)}")
-        return {"job_roles": []}
+        ]
+    }
+
+
+def _fallback_job_roles():
+    """Empty job roles data used when job_roles.json can't be parsed"""
+    return {"job_roles": []}
+
+
+taxonomy_registry.register("job_roles", JOB_ROLES_PATH, _default_job_roles, _fallback_job_roles)
+
+
+def load_job_roles():
+    """Return the job roles taxonomy from the in-memory registry (read-only)"""
+    return taxonomy_registry.get("job_roles").data
 
 
 def extract_keywords_from_job_description(job_description):
@@ -140,6 +149,90 @@ def extract_keywords_from_job_description(job_description):
     return filtered_keywords
 
 
+class JobProfile:
+    """
+    A job description compiled once for matching against many resumes
+
+    Holds the extracted keywords and a single-pass matcher over them, so the
+    requirement regexes and term scans run once per JD instead of once per resume.
+    Keywords match on word boundaries where they start or end with a word
+    character, so "java" doesn't match inside "javascript" but "c++" and
+    ".net" still match.
+    """
+
+    def __init__(self, job_description, title=None):
+        self.job_description = job_description
+        self.title = title
+        self.keywords = extract_keywords_from_job_description(job_description)
+        self.matcher = KeywordMatcher(self.keywords, word_boundary="edges")
+
+    def match(self, resume_text, resume_skills, details=True):
+        """
+        Match a resume against this job profile
+
+        Args:
+            resume_text (str): Full text of the resume
+            resume_skills (list): List of skills extracted from resume
+            details (bool): Build matched_details with each keyword's context
+                and offsets; left empty when False (e.g. when only ranking)
+
+        Returns:
+            dict: Job matching results
+        """
+        # Normalize resume text
+        resume_text_lower = resume_text.lower()
+        
+        # Locate every keyword occurrence in one pass; skills list hits count too
+        positions = self.matcher.find_all(resume_text_lower)
+        found = set(positions)
+        found.update(skill for skill in resume_skills if skill in self.matcher)
+        
+        # Find matching keywords
+        matched_keywords = []
+        missing_keywords = []
+        matched_details = []
+        
+        for keyword in self.keywords:
+            if keyword in found:
+                matched_keywords.append(keyword)
+                if not details:
+                    continue
+                spans = positions.get(keyword, [])
+                matched_details.append({
+                    "keyword": keyword,
+                    "found": True,
+                    "context": get_keyword_context(resume_text_lower, keyword, spans),
+                    "offsets": [list(span) for span in spans]
+                })
+            else:
+                missing_keywords.append(keyword)
+                if not details:
+                    continue
+                matched_details.append({
+                    "keyword": keyword,
+                    "found": False,
+                    "context": None,
+                    "offsets": []
+                })
+        
+        # Calculate match percentage
+        total_keywords = len(self.keywords) if self.keywords else 1
+        match_percentage = round((len(matched_keywords) / total_keywords) * 100)
+        
+        return {
+            "match_percentage": match_percentage,
+            "matched_keywords": matched_keywords,
+            "missing_keywords": missing_keywords,
+            "matched_details": matched_details
+        }
+
+
+@lru_cache(maxsize=128)
+def compile_job_profile(job_description):
+    """Return a compiled JobProfile, reusing it for repeated job descriptions"""
+    return JobProfile(job_description)
+
+
 def match_job_description(resume_text, job_description, resume_skills):
     """
     Match resume against job description
@@ -160,109 +253,185 @@ def match_job_description(resume_text, job_description, resume_skills):
             "matched_details": []
         }
     
-    # Extract keywords from job description
-    job_keywords = extract_keywords_from_job_description(job_description)
-    
-    # Normalize resume text
-    resume_text_lower = resume_text.lower()
-    
-    # Find matching keywords
-    matched_keywords = []
-    missing_keywords = []
-    matched_details = []
+    return compile_job_profile(job_description).match(resume_text, resume_skills)
+
+
+def get_keyword_context(text, keyword, spans=None):
+    """
+    Get surrounding context for a keyword in text
     
-    for keyword in job_keywords:
-        # Check if keyword is in resume text or resume skills
-        if keyword in resume_text_lower or keyword in resume_skills:
-            matched_keywords.append(keyword)
-            matched_details.append({
-                "keyword": keyword,
-                "found": True,
-                "context": get_keyword_context(resume_text_lower, keyword)
-            })
-        else:
-            missing_keywords.append(keyword)
-            matched_details.append({
-                "keyword": keyword,
-                "found": False,
-                "context": None
-            })
+    Args:
+        text (str): Text the keyword was found in
+        keyword (str): Keyword to show
+        spans (list): (start, end) offsets of the keyword's occurrences, in order;
+            located the way JobProfile matches keywords when not given
+        
+    Returns:
+        str: Text around the first occurrence with every occurrence in it bolded, or None
+    """
+    if spans is None:
+        spans = [match.span() for match in re.finditer(keyword_edge_pattern(keyword), text)]
+    if not spans:
+        return None
     
-    # Calculate match percentage
-    total_keywords = len(job_keywords) if job_keywords else 1
-    match_percentage = round((len(matched_keywords) / total_keywords) * 100)
+    start = max(0, spans[0][0] - 50)
+    end = min(len(text), spans[0][1] + 50)
     
-    return {
-        "match_percentage": match_percentage,
-        "matched_keywords": matched_keywords,
-        "missing_keywords": missing_keywords,
-        "matched_details": matched_details
-    }
+    # Bold the occurrences that fall inside the window, straight from their offsets
+    parts = []
+    cursor = start
+    for span_start, span_end in spans:
+        if span_start >= end:
+            break
+        if span_start < cursor or span_end > end:
+            continue
+        parts.append(text[cursor:span_start])
+        parts.append(f"**{text[span_start:span_end]}**")
+        cursor = span_end
+    parts.append(text[cursor:end])
+    return "".join(parts)
 
 
-def get_keyword_context(text, keyword):
-    """Get surrounding context for a keyword in text"""
-    try:
-        keyword_index = text.find(keyword)
-        if keyword_index >= 0:
-            start = max(0, keyword_index - 50)
-            end = min(len(text), keyword_index + len(keyword) + 50)
-            context = text[start:end]
-            # Bold the keyword
-            highlighted_context = context.replace(keyword, f"**{keyword}**")
-            return highlighted_context
-        return None
-    except:
-        return None
+class JobRoleIndex:
+    """
+    Inverted keyword -> roles index over the job roles taxonomy
+
+    Role keywords are compiled into one substring matcher, so a resume is
+    scanned once and only roles sharing at least one keyword with it are scored.
+    """
+
+    def __init__(self, job_roles):
+        self.job_roles = job_roles
+        self.matcher = KeywordMatcher(word_boundary=False)
+        # keyword -> [(role index, keyword position within the role)]
+        self.postings = {}
+
+        for role_index, role in enumerate(job_roles):
+            for position, keyword in enumerate(role["keywords"]):
+                self.matcher.add(keyword)
+                self.postings.setdefault(keyword, []).append((role_index, position))
+        self.matcher.build()
+
+    def found_keywords(self, resume_text_lower, skills):
+        """Return the set of role keywords present in the resume text or skills list"""
+        found = set(self.matcher.find_all(resume_text_lower))
+        found.update(skill for skill in skills if skill in self.postings)
+        return found
+
+    def score(self, found_keywords):
+        """
+        Score only the roles that share keywords with the resume
 
+        Args:
+            found_keywords (set): Keywords present in the resume
 
-def predict_job_role(resume_text, skills):
+        Returns:
+            dict: role index -> {"title", "score", "matched_keywords"}
+        """
+        hits = {}
+        for keyword in found_keywords:
+            for role_index, position in self.postings.get(keyword, ()):
+                hits.setdefault(role_index, []).append(position)
+
+        scores = {}
+        for role_index, positions in hits.items():
+            keywords = self.job_roles[role_index]["keywords"]
+            positions.sort()
+            scores[role_index] = {
+                "title": self.job_roles[role_index]["title"],
+                "score": round((len(positions) / len(keywords)) * 100),
+                "matched_keywords": [keywords[position] for position in positions]
+            }
+        return scores
+
+    def top_roles(self, scores, k):
+        """
+        Select the k best roles, ties broken by catalog order
+
+        Roles without any matching keyword score 0, so they are only pulled in
+        (in catalog order) when fewer than k roles scored above zero.
+
+        Returns:
+            list: (role index, score dict) pairs, best first
+        """
+        ranked = heapq.nlargest(
+            k,
+            ((score["score"], -role_index, role_index) for role_index, score in scores.items() if score["score"] > 0)
+        )
+        top = [(role_index, scores[role_index]) for _, _, role_index in ranked]
+
+        role_index = 0
+        while len(top) < k and role_index < len(self.job_roles):
+            score = scores.get(role_index)
+            if score is None:
+                top.append((role_index, {
+                    "title": self.job_roles[role_index]["title"],
+                    "score": 0,
+                    "matched_keywords": []
+                }))
+            elif score["score"] == 0:
+                top.append((role_index, score))
+            role_index += 1
+        return top
+
+
+_role_index = None
+_role_index_version = None
+
+
+def get_job_role_index():
+    """Return the process-wide job role index, rebuilding it when the taxonomy version changes"""
+    global _role_index, _role_index_version
+    entry = taxonomy_registry.get("job_roles")
+    if _role_index is None or _role_index_version != entry.version:
+        try:
+            role_index = JobRoleIndex(entry.data["job_roles"])
+        except Exception as e:
+            taxonomy_registry.record_build("job_roles", entry.version, str(e))
+            if _role_index is None:
+                raise
+            # Keep serving the last good index, and don't rebuild the broken version on every call
+            logger.error(f"Error compiling job roles taxonomy {entry.version}: {str(e)}")
+            _role_index_version = entry.version
+            return _role_index
+        _role_index = role_index
+        _role_index_version = entry.version
+        taxonomy_registry.record_build("job_roles", entry.version)
+        logger.debug(f"Built job role index over {len(_role_index.job_roles)} roles")
+    return _role_index
+
+
+def predict_job_role(resume_text, skills, top_k=3):
     """
     Predict suitable job roles based on resume content
     
     Args:
         resume_text (str): Full text of the resume
         skills (list): Extracted skills from resume
+        top_k (int): Number of top roles to return
         
     Returns:
         dict: Job role prediction results
     """
-    job_roles = load_job_roles()["job_roles"]
+    role_index = get_job_role_index()
     
     # Normalize text
     resume_text_lower = resume_text.lower()
     
-    # Count keyword matches for each job role
-    role_scores = []
-    
-    for role in job_roles:
-        title = role["title"]
-        keywords = role["keywords"]
-        
-        # Count matches
-        matches = sum(1 for keyword in keywords if keyword in resume_text_lower or keyword in skills)
-        match_percentage = round((matches / len(keywords)) * 100) if keywords else 0
-        
-        role_scores.append({
-            "title": title,
-            "score": match_percentage,
-            "matched_keywords": [keyword for keyword in keywords if keyword in resume_text_lower or keyword in skills]
-        })
+    # Score only the roles that share keywords with the resume
+    found_keywords = role_index.found_keywords(resume_text_lower, skills)
+    role_scores = role_index.score(found_keywords)
     
-    # Sort roles by score
-    role_scores.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Get top 3 roles
-    top_roles = role_scores[:3]
+    # Get top roles
+    ranked_roles = role_index.top_roles(role_scores, top_k)
+    top_roles = [score for _, score in ranked_roles]
     
     # Generate recommendations for top role
     recommendations = []
     if top_roles:
         top_role = top_roles[0]
-        missing_keywords = [
-            keyword for keyword in job_roles[job_roles.index(next(r for r in job_roles if r["title"] == top_role["title"]))]["keywords"]
-            if keyword not in resume_text_lower and keyword not in skills
-        ]
+        top_role_keywords = role_index.job_roles[ranked_roles[0][0]]["keywords"]
+        missing_keywords = [keyword for keyword in top_role_keywords if keyword not in found_keywords]
         
         if missing_keywords:
             recommendations.append(f"Consider adding skills in: {', '.join(missing_keywords[:5])}")
@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from job_matcher import JobProfile
+from scoring import BatchScorer
+
+logger = logging.getLogger(__name__)
+
+
+def job_profile_id(job_description):
+    """Content-derived id, so registering the same JD twice returns the same profile"""
+    return hashlib.sha256(job_description.strip().encode('utf-8')).hexdigest()[:16]
+
+
+class JobProfileRegistry:
+    """
+    Stores job descriptions under an id and keeps their compiled JobProfiles
+
+    JD text is persisted in SQLite so every worker process can resolve an id
+    created by another; each process compiles a profile at most once and keeps
+    up to max_compiled of them in an LRU. The row is still looked up on every
+    get(), so a profile deleted through another process stops resolving here too.
+    """
+
+    def __init__(self, path, max_compiled=256):
+        self.path = path
+        self.max_compiled = max_compiled
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_profiles ("
+                "id TEXT PRIMARY KEY, title TEXT, job_description TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def create(self, job_description, title=None):
+        """
+        Compile and store a job description
+
+        Args:
+            job_description (str): Job description text
+            title (str): Optional display title
+
+        Returns:
+            tuple: (profile id, JobProfile)
+        """
+        profile_id = job_profile_id(job_description)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO job_profiles (id, title, job_description, created_at) VALUES (?, ?, ?, ?)",
+                (profile_id, title, job_description, time.time())
+            )
+        return profile_id, self.get(profile_id)
+
+    def get(self, profile_id):
+        """Return the compiled JobProfile for an id, or None if it doesn't exist"""
+        # One query both revalidates a cached profile and supplies the text on a miss;
+        # ids are content hashes, so a row that exists always matches the cached profile
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT title, job_description FROM job_profiles WHERE id = ?", (profile_id,)
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self._compiled.pop(profile_id, None)
+                return None
+            profile = self._compiled.get(profile_id)
+            if profile is not None:
+                self._compiled.move_to_end(profile_id)
+                return profile
+
+        profile = JobProfile(row[1], title=row[0])
+        with self._lock:
+            self._compiled[profile_id] = profile
+            while len(self._compiled) > self.max_compiled:
+                self._compiled.popitem(last=False)
+        return profile
+
+    def delete(self, profile_id):
+        """Remove a job profile; returns True if it existed"""
+        with self._lock:
+            self._compiled.pop(profile_id, None)
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM job_profiles WHERE id = ?", (profile_id,)).rowcount > 0
+
+
+def rank_candidates(profile, candidates, top_k=10):
+    """
+    Score candidates against a compiled job profile and keep the best top_k
+
+    All candidates are scored in one BatchScorer pass; only the top_k are
+    matched keyword by keyword for their matched and missing lists. Equal
+    match percentages keep the order candidates were given in.
+
+    Args:
+        profile (JobProfile): Compiled job profile
+        candidates (iterable): (candidate id, resume text, skills list, extra dict) tuples
+        top_k (int): Number of candidates to return
+
+    Returns:
+        list: Ranked dicts with candidate_id, rank, match_percentage,
+            matched_keywords, missing_keywords and the extra fields
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+    best = BatchScorer([profile]).top_k(
+        [text for _, text, _, _ in candidates], [skills for _, _, skills, _ in candidates],
+        k=top_k, rank_by="match_percentage"
+    )[0]
+
+    ranked = []
+    for rank, (index, _, score) in enumerate(best, start=1):
+        candidate_id, text, skills, extra = candidates[index]
+        match = profile.match(text, skills, details=False)
+        ranked.append({
+            "candidate_id": candidate_id,
+            "rank": rank,
+            "match_percentage": score,
+            "matched_keywords": match["matched_keywords"],
+            "missing_keywords": match["missing_keywords"],
+            **extra
+        })
+    return ranked
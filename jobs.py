@@ -0,0 +1,334 @@
+import abc
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue(abc.ABC):
+    """
+    Interface for analysis job queue backends
+
+    A job carries an opaque binary payload (the uploaded file) plus JSON
+    params, and moves queued -> running -> done/failed while workers report
+    the stage they are in. Backends only need to implement these methods.
+    """
+
+    @abc.abstractmethod
+    def submit(self, payload, params):
+        """Enqueue a job and return its id"""
+
+    @abc.abstractmethod
+    def claim(self, timeout):
+        """Wait up to timeout seconds for a queued job; return (job_id, payload, params) or None"""
+
+    @abc.abstractmethod
+    def set_stage(self, job_id, stage):
+        """Record the processing stage of a running job"""
+
+    @abc.abstractmethod
+    def complete(self, job_id, result):
+        """Mark a job done with its JSON-serializable result"""
+
+    @abc.abstractmethod
+    def fail(self, job_id, error):
+        """Mark a job failed with an error message"""
+
+    @abc.abstractmethod
+    def get(self, job_id):
+        """Return the public state of a job as a dict, or None if unknown"""
+
+    def heartbeat(self, job_ids):
+        """Record that running jobs are still being worked on; backends that re-claim stale jobs must override this"""
+
+
+class InProcessJobQueue(JobQueue):
+    """Job queue held in this process's memory; jobs are lost on restart"""
+
+    def __init__(self, retention=3600):
+        self.retention = retention
+        self._jobs = {}
+        self._pending = deque()
+        self._condition = threading.Condition()
+
+    def submit(self, payload, params):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._condition:
+            self._purge(now)
+            self._jobs[job_id] = {
+                "id": job_id, "status": QUEUED, "stage": QUEUED, "result": None, "error": None,
+                "created_at": now, "updated_at": now, "payload": payload, "params": params
+            }
+            self._pending.append(job_id)
+            self._condition.notify()
+        return job_id
+
+    def claim(self, timeout):
+        with self._condition:
+            if not self._pending:
+                self._condition.wait(timeout)
+            if not self._pending:
+                return None
+            job = self._jobs[self._pending.popleft()]
+            job["status"] = job["stage"] = RUNNING
+            job["updated_at"] = time.time()
+            return job["id"], job.pop("payload"), job["params"]
+
+    def set_stage(self, job_id, stage):
+        self._update(job_id, stage=stage)
+
+    def complete(self, job_id, result):
+        self._update(job_id, status=DONE, stage=DONE, result=result)
+
+    def fail(self, job_id, error):
+        self._update(job_id, status=FAILED, stage=FAILED, error=error)
+
+    def get(self, job_id):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: job[key] for key in ("id", "status", "stage", "result", "error", "created_at", "updated_at")}
+
+    def _update(self, job_id, **fields):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated_at=time.time())
+
+    def _purge(self, now):
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in (DONE, FAILED) and now - job["updated_at"] > self.retention
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue stored in a SQLite file
+
+    Survives restarts and is shared by every worker process pointing at the
+    same path, so a job submitted to one gunicorn worker can be processed by
+    another. Workers send a heartbeat for the jobs they are running, so a
+    job whose heartbeat is older than stale_after seconds (e.g. its worker
+    was killed) is handed out again while long jobs on live workers are not.
+    """
+
+    def __init__(self, path, poll_interval=0.5, stale_after=120, retention=3600):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.retention = retention
+        self._wakeup = threading.Event()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT NOT NULL, payload BLOB, "
+                "params TEXT, result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def submit(self, payload, params):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, now - self.retention)
+            )
+            conn.execute(
+                "INSERT INTO jobs (id, status, stage, payload, params, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, QUEUED, payload, json.dumps(params), now, now)
+            )
+        self._wakeup.set()
+        return job_id
+
+    def claim(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self._claim_once()
+            if job is not None or time.monotonic() >= deadline:
+                return job
+            self._wakeup.wait(min(self.poll_interval, max(0, deadline - time.monotonic())))
+            self._wakeup.clear()
+
+    def _claim_once(self):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, payload, params FROM jobs "
+                "WHERE status = ? OR (status = ? AND updated_at < ?) ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now - self.stale_after)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, RUNNING, now, row[0])
+            )
+            conn.execute("COMMIT")
+            return row[0], row[1], json.loads(row[2] or "{}")
+        except sqlite3.Error as e:
+            logger.error(f"Error claiming job: {str(e)}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return None
+        finally:
+            conn.close()
+
+    def set_stage(self, job_id, stage):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET stage = ?, updated_at = ? WHERE id = ?", (stage, time.time(), job_id))
+
+    def heartbeat(self, job_ids):
+        if not job_ids:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ?",
+                [(time.time(), job_id, RUNNING) for job_id in job_ids]
+            )
+
+    def complete(self, job_id, result):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, result = ?, payload = NULL, updated_at = ? WHERE id = ?",
+                (DONE, DONE, json.dumps(result), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, error = ?, payload = NULL, updated_at = ? WHERE id = ?",
+                (FAILED, FAILED, error, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, stage, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0], "status": row[1], "stage": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4], "created_at": row[5], "updated_at": row[6]
+        }
+
+
+class JobError(Exception):
+    """Raised by a job handler to fail a job with a user-facing message"""
+
+
+class JobWorkerPool:
+    """
+    Background threads that take jobs off a queue and run a handler on them
+
+    handler(payload, params, set_stage) must return a JSON-serializable
+    result or raise. Threads are started by ensure_started(), which is cheap
+    to call repeatedly, and restarted after a fork, so the pool is safe to
+    create at import time under gunicorn. A heartbeat
+    thread tells the queue every heartbeat_interval seconds which jobs are
+    still running here, so they aren't mistaken for abandoned ones.
+    """
+
+    def __init__(self, queue, handler, workers=2, heartbeat_interval=30):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.heartbeat_interval = heartbeat_interval
+        self._pid = None
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._running = set()
+            for i in range(self.workers):
+                threading.Thread(target=self._run, name=f"analysis-job-worker-{i}", daemon=True).start()
+            threading.Thread(target=self._heartbeat, name="analysis-job-heartbeat", daemon=True).start()
+            logger.info(f"Started {self.workers} analysis job workers")
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                job_ids = list(self._running)
+            try:
+                self.queue.heartbeat(job_ids)
+            except Exception as e:
+                logger.error(f"Error sending job heartbeat: {str(e)}")
+
+    def _run(self):
+        while True:
+            try:
+                job = self.queue.claim(timeout=5)
+            except Exception as e:
+                logger.error(f"Error polling job queue: {str(e)}")
+                time.sleep(1)
+                continue
+            if job is None:
+                continue
+
+            job_id, payload, params = job
+            with self._lock:
+                self._running.add(job_id)
+            try:
+                result = self.handler(payload, params, lambda stage: self.queue.set_stage(job_id, stage))
+                self.queue.complete(job_id, result)
+            except JobError as e:
+                self.queue.fail(job_id, str(e))
+            except Exception as e:
+                logger.error(f"Error processing job {job_id}: {str(e)}", exc_info=True)
+                self.queue.fail(job_id, f'An error occurred during analysis: {str(e)}')
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+
+def create_job_queue(backend, path=None):
+    """
+    Build a job queue backend by name
+
+    Args:
+        backend (str): "sqlite" or "memory"
+        path (str): SQLite file for the sqlite backend
+
+    Returns:
+        JobQueue: Queue instance
+    """
+    if backend == "memory":
+        return InProcessJobQueue()
+    if backend == "sqlite":
+        return SQLiteJobQueue(path)
+    raise ValueError(f"Unknown job queue backend: {backend}")
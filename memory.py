@@ -0,0 +1,82 @@
+import logging
+import os
+import resource
+
+logger = logging.getLogger(__name__)
+
+# Hard ceiling on each worker's data segment in MB (0 disables). Past it,
+# allocations raise MemoryError in that worker instead of the kernel
+# OOM-killing the whole pod.
+WORKER_MEMORY_LIMIT_MB = int(os.environ.get("WORKER_MEMORY_LIMIT_MB", "0"))
+
+_page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc isn't available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _page_size
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss():
+    """Highest resident set size this process has reached, in bytes"""
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def set_memory_limit(limit_mb=WORKER_MEMORY_LIMIT_MB):
+    """
+    Cap this process's data segment (heap and anonymous mappings)
+
+    Meant for gunicorn's post_fork hook. With preload_app the model pages the
+    worker shares with the master count towards the limit too, so it has to
+    be set well above the size of a freshly forked worker.
+
+    Args:
+        limit_mb (int): Limit in megabytes; 0 leaves the process unlimited
+
+    Returns:
+        bool: True if a limit was set
+    """
+    if limit_mb <= 0:
+        return False
+    limit = limit_mb * 1024 * 1024
+    try:
+        _, hard = resource.getrlimit(resource.RLIMIT_DATA)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, hard))
+        logger.info(f"Worker {os.getpid()} memory limited to {limit // (1024 * 1024)} MB")
+        return True
+    except (ValueError, OSError) as e:
+        logger.error(f"Could not set worker memory limit: {str(e)}")
+        return False
+
+
+class MemoryUsage:
+    """RSS of the process at the start of an operation, and how much it grew by the end"""
+
+    def __init__(self):
+        self.start = current_rss()
+
+    def growth(self):
+        """Bytes the RSS grew since start (0 if it shrank), or None if RSS can't be read"""
+        end = current_rss()
+        if self.start is None or end is None:
+            return None
+        return max(0, end - self.start)
+
+    def describe(self):
+        """Short summary for logs and the Server-Timing header"""
+        growth = self.growth()
+        rss = current_rss()
+        parts = []
+        if rss is not None:
+            parts.append(f"rss={rss / 1048576:.1f}MB")
+        if growth is not None:
+            parts.append(f"growth={growth / 1048576:.1f}MB")
+        parts.append(f"peak={peak_rss() / 1048576:.1f}MB")
+        return " ".join(parts)
@@ -0,0 +1,343 @@
+import abc
+import bisect
+import contextvars
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Directory shared by all worker processes for metric snapshots; unset keeps metrics per process
+METRICS_DIR = os.environ.get("METRICS_DIR")
+# Seconds between snapshot writes from a worker
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+TEXT_LENGTH_BUCKETS = (1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2000))
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric(abc.ABC):
+    """Base class for labelled metrics; values are kept per tuple of label values"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self):
+        """Return [[label values, value], ...] in a JSON-serializable form"""
+        with self._lock:
+            return [[list(key), self._copy(value)] for key, value in self._values.items()]
+
+    def _copy(self, value):
+        return value
+
+    @abc.abstractmethod
+    def merge(self, values, other):
+        """Add another snapshot's values into a {key: value} dict"""
+
+    @abc.abstractmethod
+    def samples(self, key, value):
+        """Yield (name, labels, value) exposition samples for one label set"""
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def merge(self, values, other):
+        for key, value in other:
+            key = tuple(key)
+            values[key] = values.get(key, 0) + value
+
+    def samples(self, key, value):
+        yield self.name, list(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # Per-bucket counts (not cumulative), then sum and count
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _copy(self, value):
+        return list(value)
+
+    def merge(self, values, other):
+        for key, value in other:
+            key = tuple(key)
+            if key in values:
+                values[key] = [a + b for a, b in zip(values[key], value)]
+            else:
+                values[key] = list(value)
+
+    def samples(self, key, value):
+        labels = list(zip(self.labelnames, key))
+        cumulative = 0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            yield f"{self.name}_bucket", labels + [("le", _format_value(bound))], cumulative
+        yield f"{self.name}_bucket", labels + [("le", "+Inf")], value[-1]
+        yield f"{self.name}_sum", labels, value[-2]
+        yield f"{self.name}_count", labels, value[-1]
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and renders them in the Prometheus text format
+
+    Under gunicorn each worker has its own registry. When directory is set,
+    every worker writes a snapshot there at most every flush_interval seconds
+    and render() adds up the snapshots of all workers, so whichever worker
+    answers /metrics reports totals for the whole server.
+
+    This covers the counters and histograms the app uses without adding
+    prometheus_client, whose multiprocess mode needs PROMETHEUS_MULTIPROC_DIR
+    set before import and a gunicorn child_exit hook to clean up per-pid files.
+    """
+
+    def __init__(self, directory=METRICS_DIR, flush_interval=METRICS_FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def _snapshot_path(self, pid=None):
+        return os.path.join(self.directory, f"{pid or os.getpid()}.json")
+
+    def flush(self, force=False):
+        """Write this process's snapshot to the shared directory if it is due"""
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self._snapshot_path())
+        except OSError as e:
+            logger.error(f"Error writing metrics snapshot: {str(e)}")
+
+    def _collect(self):
+        """Return {name: {key: value}} with every worker's snapshot merged in"""
+        snapshots = [self.snapshot()]
+        if self.directory:
+            self.flush(force=True)
+            snapshots = []
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.error(f"Error reading metrics snapshot {path}: {str(e)}")
+
+        merged = {name: {} for name in self._metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                if name in self._metrics:
+                    self._metrics[name].merge(merged[name], values)
+        return merged
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, values in self._collect().items():
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key in sorted(values):
+                for sample_name, labels, value in metric.samples(key, values[key]):
+                    lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def clear_snapshots(directory=METRICS_DIR):
+    """Remove worker snapshots left by a previous server run"""
+    if not directory:
+        return
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    "hirelens_stage_duration_seconds", "Time spent in each analysis stage", ["stage"]
+)
+stage_errors = registry.counter(
+    "hirelens_stage_errors_total", "Analysis stages that raised an exception", ["stage"]
+)
+files_analyzed = registry.counter(
+    "hirelens_files_total", "Resumes analyzed, by file type", ["file_type"]
+)
+document_pages = registry.histogram(
+    "hirelens_document_pages", "Pages per extracted document", ["file_type"], buckets=PAGE_BUCKETS
+)
+text_length = registry.histogram(
+    "hirelens_text_length_chars", "Characters of text extracted per document", ["file_type"],
+    buckets=TEXT_LENGTH_BUCKETS
+)
+text_truncated = registry.counter(
+    "hirelens_text_truncated_total", "Extracted texts cut to a size limit, by limit", ["limit"]
+)
+analysis_memory = registry.histogram(
+    "hirelens_analysis_memory_growth_bytes", "Worker RSS growth during one analysis", buckets=MEMORY_BUCKETS
+)
+near_duplicates_reused = registry.counter(
+    "hirelens_near_duplicates_total", "Uploads analyzed by reusing a near-duplicate resume's analysis"
+)
+analysis_errors = registry.counter(
+    "hirelens_analysis_errors_total", "Failed analyses, by reason", ["reason"]
+)
+admission_rejected = registry.counter(
+    "hirelens_admission_rejected_total", "Analysis requests shed under load, by reason", ["reason"]
+)
+admission_wait_seconds = registry.histogram(
+    "hirelens_admission_wait_seconds", "Time analysis requests waited for a free slot"
+)
+http_requests = registry.counter(
+    "hirelens_http_requests_total", "HTTP requests, by endpoint, method and status", ["endpoint", "method", "status"]
+)
+http_request_seconds = registry.histogram(
+    "hirelens_http_request_duration_seconds", "HTTP request latency, by endpoint", ["endpoint"]
+)
+
+
+class StageTimings:
+    """Stage durations of one request, for the Server-Timing header"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # stage -> [total seconds, calls], in the order stages first ran
+        self.durations = {}
+        # name -> description, for entries without a duration
+        self.notes = {}
+
+    def add(self, stage, seconds):
+        entry = self.durations.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def note(self, name, description):
+        self.notes[name] = description
+
+    def header(self):
+        """Return a Server-Timing header value, durations in milliseconds; repeated stages are summed"""
+        entries = [
+            f"{stage};dur={seconds * 1000:.1f}" + (f';desc="{calls} calls"' if calls > 1 else "")
+            for stage, (seconds, calls) in self.durations.items()
+        ]
+        entries.extend(f'{name};desc="{description}"' for name, description in self.notes.items())
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_timings = contextvars.ContextVar("stage_timings", default=None)
+
+
+def start_timings():
+    """Start collecting stage timings for the current request; returns a token for reset_timings()"""
+    return _current_timings.set(StageTimings())
+
+
+def current_timings():
+    return _current_timings.get()
+
+
+def reset_timings(token):
+    _current_timings.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a block as an analysis stage
+
+    The duration goes into the stage histogram and, inside a request, into the
+    request's Server-Timing breakdown. Exceptions are counted and re-raised.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_errors.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_seconds.observe(elapsed, stage=name)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(name, elapsed)
@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used by the MinHash permutations (as in datasketch)
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Shingles hashed per step when computing a signature; bounds the permutation matrix to num_perm x this
+SIGNATURE_CHUNK = 4096
+
+_word_pattern = re.compile(r'\w+')
+
+
+def shingles(text, size=5):
+    """Return the set of word size-shingles of text, lower-cased"""
+    words = _word_pattern.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures of resume texts with an LSH index over them
+
+    Signatures are split into bands; two resumes become candidates when any
+    band hashes to the same bucket, and a candidate counts as a near
+    duplicate when the share of equal signature values (an estimate of the
+    Jaccard similarity of their shingle sets) reaches threshold. Signatures
+    and buckets live in SQLite so every worker process sees the same index.
+    """
+
+    def __init__(self, path, num_perm=128, bands=16, threshold=0.9, shingle_size=5, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS minhash_signatures ("
+                "resume_id TEXT PRIMARY KEY, signature BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS minhash_buckets ("
+                "band INTEGER NOT NULL, bucket INTEGER NOT NULL, resume_id TEXT NOT NULL, "
+                "PRIMARY KEY (band, bucket, resume_id))"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a text
+
+        Args:
+            text (str): Extracted resume text
+
+        Returns:
+            numpy.ndarray: num_perm uint32 values, or None if the text has no words
+        """
+        shingle_set = shingles(text, self.shingle_size)
+        if not shingle_set:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') for s in shingle_set),
+            dtype=np.uint64, count=len(shingle_set)
+        )
+        # One row per permutation, over a bounded slice of shingles at a time so
+        # a long text never builds a num_perm x shingles matrix; uint64 products
+        # wrap, which is fine for hashing
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(hashes), SIGNATURE_CHUNK):
+            chunk = hashes[start:start + SIGNATURE_CHUNK]
+            permuted = (np.outer(self._a, chunk) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+    def _buckets(self, signature):
+        """Return one bucket id per band"""
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            buckets.append(int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), 'little', signed=True))
+        return buckets
+
+    def similarity(self, signature, other):
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(signature == other))
+
+    def add(self, resume_id, signature):
+        """Index a resume's signature; re-adding a resume replaces its buckets"""
+        if signature is None:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM minhash_buckets WHERE resume_id = ?", (resume_id,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO minhash_signatures (resume_id, signature, created_at) VALUES (?, ?, ?)",
+                    (resume_id, signature.tobytes(), time.time())
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO minhash_buckets (band, bucket, resume_id) VALUES (?, ?, ?)",
+                    [(band, bucket, resume_id) for band, bucket in enumerate(self._buckets(signature))]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error indexing resume {resume_id} for near-duplicates: {str(e)}")
+
+    def query(self, signature, exclude=None, limit=10):
+        """
+        Find indexed resumes that are near duplicates of a signature
+
+        Args:
+            signature (numpy.ndarray): Signature from signature()
+            exclude (str): Resume id to leave out (usually the upload itself)
+            limit (int): Maximum number of matches
+
+        Returns:
+            list: (resume_id, similarity) pairs at or above threshold, most similar first
+        """
+        if signature is None:
+            return []
+        buckets = self._buckets(signature)
+        try:
+            with self._connect() as conn:
+                clauses = " OR ".join("(band = ? AND bucket = ?)" for _ in buckets)
+                params = [value for pair in enumerate(buckets) for value in pair]
+                candidates = {
+                    row[0] for row in conn.execute(f"SELECT resume_id FROM minhash_buckets WHERE {clauses}", params)
+                }
+                candidates.discard(exclude)
+                if not candidates:
+                    return []
+                rows = conn.execute(
+                    f"SELECT resume_id, signature FROM minhash_signatures "
+                    f"WHERE resume_id IN ({', '.join('?' for _ in candidates)})",
+                    list(candidates)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error querying near-duplicate index: {str(e)}")
+            return []
+
+        matches = []
+        for resume_id, blob in rows:
+            similarity = self.similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold:
+                matches.append((resume_id, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
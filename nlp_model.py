@@ -0,0 +1,221 @@
+import logging
+import os
+import time
+
+import spacy
+from spacy.tokens import Doc
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+
+# Text size limits; extracted text past them is cut before any analysis runs
+TEXT_MAX_CHARS = int(os.environ.get("TEXT_MAX_CHARS", "500000"))
+NLP_MAX_TOKENS = int(os.environ.get("NLP_MAX_TOKENS", "100000"))
+# Texts longer than this are parsed in line-aligned chunks through nlp.pipe
+NLP_CHUNK_CHARS = int(os.environ.get("NLP_CHUNK_CHARS", "50000"))
+
+# Parsed once after loading so the first real request doesn't pay for lazy initialisation
+WARM_UP_TEXT = (
+    "Jane Doe\njane.doe@example.com | (555) 123-4567\n\n"
+    "Experience\nSenior Software Engineer at Acme Corp, 2018 - 2023\n"
+    "Built data pipelines in Python and SQL on AWS.\n\n"
+    "Education\nBachelor of Science in Computer Science, Stanford University, 2016\n\n"
+    "Skills\nPython, Java, Docker, Kubernetes, leadership, communication\n"
+)
+
+_state = {"nlp": None, "ready": False, "loaded_at": None, "warm_up_seconds": None, "error": None}
+
+# Taxonomies compiled into matchers; each must have a compiled version in service for the worker to be ready
+COMPILED_TAXONOMIES = ("skills", "job_roles")
+
+
+class ModelNotAvailableError(RuntimeError):
+    """Raised at startup when the configured spaCy model isn't installed"""
+
+
+def load_model(name=SPACY_MODEL):
+    """
+    Load and warm up the spaCy model
+
+    Meant to run once at import time; under gunicorn with preload_app the
+    import happens in the master, so forked workers share the loaded model
+    copy-on-write instead of each loading their own.
+
+    Args:
+        name (str): spaCy model package name or path
+
+    Returns:
+        spacy.language.Language: Loaded pipeline
+
+    Raises:
+        ModelNotAvailableError: If the model isn't installed
+    """
+    try:
+        nlp = spacy.load(name)
+    except OSError as e:
+        _state["error"] = str(e)
+        raise ModelNotAvailableError(
+            f"spaCy model '{name}' is not installed. Install it before starting the server, "
+            f"e.g. `python -m spacy download {name}`."
+        ) from e
+
+    _state["nlp"] = nlp
+    _state["loaded_at"] = time.time()
+    logger.info(f"spaCy model {name} loaded successfully")
+
+    started = time.perf_counter()
+    nlp(WARM_UP_TEXT)
+    _state["warm_up_seconds"] = round(time.perf_counter() - started, 3)
+    _state["ready"] = True
+    logger.info(f"spaCy model warmed up in {_state['warm_up_seconds']}s")
+    return nlp
+
+
+def _cut(text, limit):
+    """Cut text to at most limit characters, at a line break in the second half if there is one"""
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut + 1] if cut >= limit // 2 else text[:limit]
+
+
+def limit_text(nlp, text, max_chars=None, max_tokens=None):
+    """
+    Apply the character and token limits to extracted text
+
+    Tokens are only counted (with the tokenizer alone) when the text has more
+    characters than max_tokens, since a token is at least one character.
+
+    Args:
+        nlp (spacy.language.Language): Pipeline whose tokenizer counts tokens
+        text (str): Extracted resume text
+        max_chars (int): Character limit, TEXT_MAX_CHARS by default
+        max_tokens (int): Token limit, NLP_MAX_TOKENS by default
+
+    Returns:
+        tuple: (text within the limits, "characters", "tokens" or None for the limit that cut it)
+    """
+    max_chars = TEXT_MAX_CHARS if max_chars is None else max_chars
+    max_tokens = NLP_MAX_TOKENS if max_tokens is None else max_tokens
+    truncated_by = None
+
+    if len(text) > max_chars:
+        text = _cut(text, max_chars)
+        truncated_by = "characters"
+    if len(text) > max_tokens:
+        tokens = nlp.tokenizer(text)
+        if len(tokens) > max_tokens:
+            text = _cut(text, tokens[max_tokens].idx)
+            truncated_by = "tokens"
+    return text, truncated_by
+
+
+def split_chunks(text, chunk_chars):
+    """
+    Split text into consecutive pieces of at most chunk_chars characters
+
+    Pieces end at a blank line, a line break or whitespace where possible and
+    concatenate back to exactly text, so offsets carry over unchanged.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > chunk_chars:
+        end = start + chunk_chars
+        for separator in ("\n\n", "\n", " "):
+            cut = text.rfind(separator, start + chunk_chars // 2, end)
+            if cut != -1:
+                end = cut + len(separator)
+                break
+        chunks.append(text[start:end])
+        start = end
+    chunks.append(text[start:])
+    return chunks
+
+
+def parse_text(nlp, text, chunk_chars=None):
+    """
+    Run the pipeline over text, in chunks when it is long
+
+    Long texts go through nlp.pipe as line-aligned chunks, bounding the
+    parser's working memory and staying under nlp.max_length. The chunk docs
+    are joined with Doc.from_docs, which shifts entity and sentence offsets
+    back onto the full text, so callers get one Doc whose text is text.
+
+    Args:
+        nlp (spacy.language.Language): Loaded spaCy pipeline
+        text (str): Text to parse
+        chunk_chars (int): Chunk size, NLP_CHUNK_CHARS by default
+
+    Returns:
+        spacy.tokens.Doc: Parsed document
+    """
+    chunk_chars = NLP_CHUNK_CHARS if chunk_chars is None else chunk_chars
+    if len(text) <= chunk_chars:
+        return nlp(text)
+    chunks = split_chunks(text, chunk_chars)
+    logger.debug(f"Parsing {len(text)} characters in {len(chunks)} chunks")
+    return Doc.from_docs(list(nlp.pipe(chunks)), ensure_whitespace=False)
+
+
+def parse_many(nlp, pairs, batch_size=16, n_process=1, chunk_chars=None):
+    """
+    Parse (text, context) pairs, batching the short texts through nlp.pipe
+
+    Texts longer than chunk_chars are parsed one at a time with parse_text()
+    after the batch, so yielded pairs are not necessarily in input order.
+
+    Yields:
+        tuple: (spacy.tokens.Doc, context)
+    """
+    chunk_chars = NLP_CHUNK_CHARS if chunk_chars is None else chunk_chars
+    short, long = [], []
+    for text, context in pairs:
+        (short if len(text) <= chunk_chars else long).append((text, context))
+    yield from nlp.pipe(short, as_tuples=True, batch_size=batch_size, n_process=n_process)
+    for text, context in long:
+        yield parse_text(nlp, text, chunk_chars), context
+
+
+def warm_up_taxonomies():
+    """
+    Compile the skill matcher and job role index so workers inherit them ready-built
+
+    Run once before forking. After a taxonomy edit the getters rebuild them
+    on their next use and record the outcome in the taxonomy registry, where
+    model_status() reads it. A failure is logged instead of raised.
+
+    Returns:
+        bool: True if both are compiled for the current taxonomy versions
+    """
+    from analyzer import get_skill_matcher
+    from job_matcher import get_job_role_index
+
+    try:
+        # Builds the Aho-Corasick automata now rather than on the first scan after the fork
+        get_skill_matcher().build()
+        get_job_role_index().matcher.build()
+    except Exception as e:
+        logger.error(f"Error compiling taxonomies: {str(e)}")
+        return False
+    return True
+
+
+def model_status():
+    """
+    Return readiness details for the health endpoints
+
+    Only reports state already recorded: nothing is loaded, compiled or
+    stat()ed here, so a readiness probe stays fast while a taxonomy compiles.
+    """
+    from taxonomy import registry as taxonomy_registry
+
+    builds = taxonomy_registry.build_status()
+    taxonomy_errors = [f"{name}: {build['error']}" for name, build in builds.items() if build["error"]]
+    return {
+        "model": SPACY_MODEL,
+        "ready": _state["ready"] and all(builds.get(name, {}).get("version") for name in COMPILED_TAXONOMIES),
+        "loaded_at": _state["loaded_at"],
+        "warm_up_seconds": _state["warm_up_seconds"],
+        "error": _state["error"] or ("; ".join(taxonomy_errors) or None),
+        "taxonomy_version": {name: build["version"] for name, build in builds.items()},
+        "pid": os.getpid()
+    }
@@ -0,0 +1,418 @@
+import contextvars
+import io
+import logging
+import math
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import PyPDF2
+
+from profiling import StackSampler
+
+logger = logging.getLogger(__name__)
+
+# Extraction limits; all can be overridden through the environment
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "50"))
+PDF_PAGE_TIMEOUT = float(os.environ.get("PDF_PAGE_TIMEOUT", "5"))
+PDF_DOCUMENT_TIMEOUT = float(os.environ.get("PDF_DOCUMENT_TIMEOUT", "20"))
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Documents with fewer pages than this are extracted in one task, in-process when called from the main thread
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "4"))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+# Collects stack samples from pool tasks inside sample_page_workers()
+_worker_samples = contextvars.ContextVar("pdf_worker_samples", default=None)
+
+
+class PageTimeout(Exception):
+    """Raised inside a worker when a single page exceeds its time budget"""
+
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Interrupt the enclosed block with PageTimeout after the given number of seconds
+
+    Uses SIGALRM, so it only applies in a process's main thread (which is
+    where pool workers run tasks); elsewhere the block runs unbounded.
+    """
+    if seconds is None or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def looks_garbled(text):
+    """Heuristic check for empty or undecodable page text (missing fonts, CID glyphs)"""
+    stripped = text.strip()
+    if not stripped:
+        return True
+    if "(cid:" in stripped or stripped.count("�") * 20 > len(stripped):
+        return True
+    if len(stripped) < 20:
+        return False
+    readable = sum(1 for ch in stripped if ch.isalnum() or ch.isspace() or ch in ".,;:-()/&@+#'\"%|*•")
+    return readable / len(stripped) < 0.7
+
+
+def extract_page_with_pdfminer(pdf_bytes, page_number):
+    """Extract a single page with pdfminer, or return None if it isn't available or fails"""
+    try:
+        from pdfminer.high_level import extract_text as extract_text_pdfminer
+        return extract_text_pdfminer(io.BytesIO(pdf_bytes), page_numbers=[page_number])
+    except Exception as e:
+        logger.debug(f"pdfminer fallback failed on page {page_number}: {str(e)}")
+        return None
+
+
+def extract_pages(pdf_bytes, page_numbers, page_timeout, deadline, reader=None):
+    """
+    Extract a group of pages, each under its own time budget
+
+    Runs in a pool worker (or inline for small documents). PyPDF2 is tried
+    first; pdfminer is used for the page when PyPDF2 fails or returns empty or
+    garbled text. Pages left when the document deadline passes are skipped.
+
+    Args:
+        pdf_bytes (bytes): Whole PDF file
+        page_numbers (list): Zero-based page indices to extract
+        page_timeout (float): Seconds allowed per page, including fallback
+        deadline (float): time.time() after which remaining pages are skipped
+        reader (PyPDF2.PdfReader): Reader already open on pdf_bytes, if any
+
+    Returns:
+        list: (page number, text, status) tuples; status is one of
+            "ok", "fallback", "timeout", "error" or "skipped"
+    """
+    if reader is None:
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    results = []
+
+    for page_number in page_numbers:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            results.append((page_number, "", "skipped"))
+            continue
+
+        text = ""
+        status = "ok"
+        try:
+            with time_limit(min(page_timeout, remaining)):
+                try:
+                    text = reader.pages[page_number].extract_text() or ""
+                except PageTimeout:
+                    raise
+                except Exception as e:
+                    logger.debug(f"PyPDF2 failed on page {page_number}: {str(e)}")
+                    status = "error"
+
+                if status == "error" or looks_garbled(text):
+                    fallback_text = extract_page_with_pdfminer(pdf_bytes, page_number)
+                    if fallback_text and fallback_text.strip():
+                        text = fallback_text
+                        status = "fallback"
+        except PageTimeout:
+            text = ""
+            status = "timeout"
+
+        results.append((page_number, text, status))
+
+    return results
+
+
+def extract_document(pdf_bytes, max_pages, page_timeout, deadline, split_pages):
+    """
+    Open a PDF and count its pages under the page budget, extracting small documents whole
+
+    Parsing the cross-reference table and page tree can be as slow as
+    extracting a page, so it runs in a pool worker (or in a main thread)
+    like the pages themselves.
+
+    Args:
+        pdf_bytes (bytes): Whole PDF file
+        max_pages (int): Only the first max_pages pages are extracted
+        page_timeout (float): Seconds allowed for opening the document and for each page
+        deadline (float): time.time() after which remaining pages are skipped
+        split_pages (float): Documents with at least this many pages to extract
+            are left for the caller to spread over the pool
+
+    Returns:
+        tuple: (page count, extract_pages() results, or None if the document was
+            only counted)
+
+    Raises:
+        PageTimeout: If opening the document exceeds its budget
+    """
+    with time_limit(min(page_timeout, max(deadline - time.time(), 0))):
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        page_count = len(reader.pages)
+    page_numbers = list(range(min(page_count, max_pages)))
+    if len(page_numbers) >= split_pages:
+        return page_count, None
+    return page_count, extract_pages(pdf_bytes, page_numbers, page_timeout, deadline, reader)
+
+
+def extract_text_with_pdfminer(pdf_bytes, max_pages, timeout):
+    """Extract a whole document with pdfminer under one time budget; returns None if it isn't available"""
+    try:
+        from pdfminer.high_level import extract_text as extract_text_pdfminer
+    except ImportError:
+        return None
+    with time_limit(timeout):
+        return extract_text_pdfminer(io.BytesIO(pdf_bytes), maxpages=max_pages)
+
+
+def get_executor():
+    """Return the process pool for page extraction, creating it lazily in each worker process"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def reset_executor(executor=None, terminate=False):
+    """
+    Drop a broken or stuck pool so the next document gets a fresh one
+
+    Args:
+        executor (ProcessPoolExecutor): Pool to drop; nothing happens if another
+            thread has already replaced it. The current pool by default.
+        terminate (bool): Kill the pool's processes, for tasks that ignored
+            their time budget (e.g. stuck in C code where SIGALRM can't interrupt)
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None or (executor is not None and executor is not _executor):
+            return
+        if terminate:
+            # ProcessPoolExecutor has no public way to stop a running task
+            for process in list((_executor._processes or {}).values()):
+                process.terminate()
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def run_budgeted(fn, *args, timeout):
+    """
+    Run fn(*args) under a budget that holds in any thread
+
+    In a main thread fn runs inline, where its own time_limit() applies.
+    Elsewhere SIGALRM can't fire, so it runs in the page pool, and a task
+    still running a second after timeout gets the pool recycled.
+
+    Raises:
+        PageTimeout: If the task overran
+    """
+    if threading.current_thread() is threading.main_thread():
+        return fn(*args)
+    executor = get_executor()
+    future = submit(executor, fn, *args)
+    done, _ = wait([future], timeout=max(timeout, 0) + 1)
+    if not done:
+        logger.error(f"PDF task {fn.__name__} overran its {timeout:.1f}s budget, recycling the page pool")
+        reset_executor(executor, terminate=True)
+        raise PageTimeout()
+    try:
+        return task_result(future)
+    except BrokenProcessPool:
+        reset_executor(executor)
+        raise
+
+
+def sampled_task(fn, *args):
+    """
+    Run fn(*args) in a pool worker under a stack sampler
+
+    Returns:
+        tuple: (result of fn, samples as StackSampler.samples, rooted at fn)
+    """
+    depth = 0
+    frame = sys._getframe()
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    sampler = StackSampler(threading.get_ident(), skip_frames=depth)
+    sampler.start()
+    try:
+        result = fn(*args)
+    finally:
+        sampler.stop()
+    return result, sampler.samples
+
+
+def submit(executor, fn, *args):
+    """Submit a task to the page pool, sampling it inside the worker when sample_page_workers() is active"""
+    if _worker_samples.get() is None:
+        return executor.submit(fn, *args)
+    return executor.submit(sampled_task, fn, *args)
+
+
+def task_result(future):
+    """Return the result of a task from submit(), collecting its stack samples if it was sampled"""
+    samples = _worker_samples.get()
+    if samples is None:
+        return future.result()
+    result, task_samples = future.result()
+    samples.extend(task_samples)
+    return result
+
+
+@contextmanager
+def sample_page_workers():
+    """
+    Sample the stacks of page pool tasks started while the block runs
+
+    Used when profiling a request: extraction still runs in the pool under
+    its page and document budgets, and the pool workers' own stacks are
+    returned so PyPDF2 and pdfminer show up in the profile rather than only
+    a wait on the pool. Tasks run inline in a main thread are sampled by
+    the request's own profiler instead.
+
+    Yields:
+        list: (stack, seconds) samples from the workers, filled in as tasks finish
+    """
+    samples = []
+    token = _worker_samples.set(samples)
+    try:
+        yield samples
+    finally:
+        _worker_samples.reset(token)
+
+
+def read_pdf_bytes(file):
+    """Read a PDF from a path or a seekable binary file object"""
+    if isinstance(file, str):
+        with open(file, 'rb') as f:
+            return f.read()
+    file.seek(0)
+    return file.read()
+
+
+def extract_pdf(file, max_pages=None, page_timeout=None, document_timeout=None, workers=None):
+    """
+    Extract text from a PDF with page-level parallelism and time budgets
+
+    Args:
+        file (str or file object): Path or seekable binary file object
+        max_pages (int): Only the first max_pages pages are extracted
+        page_timeout (float): Seconds allowed per page
+        document_timeout (float): Seconds allowed for the whole document
+        workers (int): Pool size; 0 or 1 extracts in one task
+
+    Page budgets rely on SIGALRM, which only fires in a main thread. Called
+    from any other thread (a gthread request or the admission pool), even a
+    small document goes to the page pool, whose workers can be interrupted.
+    The document is opened and its pages counted inside that budget too.
+
+    Returns:
+        dict: text plus page_count, pages_extracted, fallback_pages,
+            timed_out_pages, failed_pages, skipped_pages, truncated and seconds
+
+    Raises:
+        PageTimeout: If the document couldn't be opened within its budget
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    page_timeout = PDF_PAGE_TIMEOUT if page_timeout is None else page_timeout
+    document_timeout = PDF_DOCUMENT_TIMEOUT if document_timeout is None else document_timeout
+    workers = PDF_WORKERS if workers is None else workers
+
+    started = time.time()
+    deadline = started + document_timeout
+    pdf_bytes = read_pdf_bytes(file)
+    # Small documents (or every document with a single worker) are counted and extracted in one task
+    split_pages = PDF_PARALLEL_MIN_PAGES if workers > 1 else math.inf
+    page_count, results = run_budgeted(
+        extract_document, pdf_bytes, max_pages, page_timeout, deadline, split_pages,
+        timeout=deadline - time.time()
+    )
+    page_numbers = list(range(min(page_count, max_pages)))
+
+    if results is None:
+        results = []
+        chunk_size = math.ceil(len(page_numbers) / workers)
+        chunks = [page_numbers[i:i + chunk_size] for i in range(0, len(page_numbers), chunk_size)]
+        try:
+            executor = get_executor()
+            futures = [submit(executor, extract_pages, pdf_bytes, chunk, page_timeout, deadline) for chunk in chunks]
+            # Workers stop on their own at the deadline; allow a little slack for the round-trip
+            done, not_done = wait(futures, timeout=max(0, deadline - time.time()) + 1)
+            if not_done:
+                # A task past the deadline is stuck where its alarm can't reach; cancel()
+                # can't stop a running task, so the pool's processes are replaced
+                logger.error(f"{len(not_done)} PDF page tasks overran the document deadline, recycling the page pool")
+                reset_executor(executor, terminate=True)
+            for future in done:
+                try:
+                    results.extend(task_result(future))
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    logger.error(f"PDF page extraction task failed: {str(e)}")
+        except BrokenProcessPool as e:
+            logger.error(f"PDF extraction pool broke, resetting it: {str(e)}")
+            reset_executor(executor)
+
+    pages = {page_number: (text, status) for page_number, text, status in results}
+    statuses = [pages.get(page_number, ("", "skipped"))[1] for page_number in page_numbers]
+    text = "".join(pages.get(page_number, ("", ""))[0] + "\n" for page_number in page_numbers)
+
+    report = {
+        "text": text,
+        "page_count": page_count,
+        "pages_extracted": sum(1 for status in statuses if status in ("ok", "fallback")),
+        "fallback_pages": statuses.count("fallback"),
+        "timed_out_pages": statuses.count("timeout"),
+        "failed_pages": statuses.count("error"),
+        "skipped_pages": statuses.count("skipped"),
+        "truncated": page_count > len(page_numbers),
+        "seconds": round(time.time() - started, 3)
+    }
+    logger.debug(
+        f"Extracted {report['pages_extracted']}/{page_count} PDF pages in {report['seconds']}s "
+        f"({report['fallback_pages']} fallback, {report['timed_out_pages']} timed out, "
+        f"{report['skipped_pages']} skipped)"
+    )
+    return report
+
+
+def extract_pdf_with_pdfminer(file, max_pages=None, document_timeout=None):
+    """
+    Extract a PDF that PyPDF2 can't open with pdfminer, under the document budget
+
+    Args:
+        file (str or file object): Path or seekable binary file object
+        max_pages (int): Only the first max_pages pages are extracted
+        document_timeout (float): Seconds allowed for the whole document
+
+    Returns:
+        str: Extracted text, or None if pdfminer isn't available
+
+    Raises:
+        PageTimeout: If extraction exceeds the budget
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    document_timeout = PDF_DOCUMENT_TIMEOUT if document_timeout is None else document_timeout
+    return run_budgeted(
+        extract_text_with_pdfminer, read_pdf_bytes(file), max_pages, document_timeout, timeout=document_timeout
+    )
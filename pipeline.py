@@ -0,0 +1,337 @@
+import logging
+
+from resume_parser import extract_email, extract_info, extract_phone
+from analyzer import SKILL_CATEGORIES, extract_skills
+from doc_store import doc_from_bytes
+from sections import segment_sections
+from job_matcher import match_job_description, predict_job_role
+from metrics import stage
+from nlp_model import parse_many, parse_text
+from skill_matcher import KeywordMatcher
+from taxonomy import registry as taxonomy_registry
+
+logger = logging.getLogger(__name__)
+
+# Characters at the top of a resume parsed for the name when refreshing a near-duplicate's profile
+PERSONAL_INFO_HEAD_CHARS = 1000
+
+
+class AnalysisError(Exception):
+    """An analysis failure that should be reported to the client as-is"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def analyze_profile(doc, text):
+    """
+    Run the job-description independent analysis stages
+
+    Args:
+        doc (spacy.tokens.Doc): spaCy Doc object of resume text
+        text (str): Raw text of the resume
+
+    Returns:
+        dict: personal_info, skills and job_role_prediction
+    """
+    # Locate the resume sections once for every extractor
+    sections = segment_sections(text)
+
+    # Extract structured information
+    with stage('extract_info'):
+        info = extract_info(doc, text, sections)
+
+    # Extract skills
+    with stage('extract_skills'):
+        skills_data = extract_skills(doc, text, sections)
+
+    # Predict job roles
+    with stage('predict_job_role'):
+        job_role_prediction = predict_job_role(text, skills_data['skills'])
+
+    return {
+        'personal_info': info,
+        'skills': skills_data,
+        'job_role_prediction': job_role_prediction
+    }
+
+
+def personal_info_prefix(text, sections):
+    """
+    Return the length of the shortest prefix of text that extract_info() reads from the Doc
+
+    The name comes from the first tokens and institutions from entities in
+    the education sections. Without an experience section the experience
+    fallback scans every sentence, so the whole text is needed.
+    """
+    if not sections.lines("experience"):
+        return len(text)
+    end = text.rfind('\n', 0, PERSONAL_INFO_HEAD_CHARS)
+    end = len(text) if len(text) <= PERSONAL_INFO_HEAD_CHARS or end < 0 else end
+    for section in sections.get("education"):
+        end = max(end, section.end)
+    return min(end, len(text))
+
+
+def refresh_profile(profile, text, nlp=None):
+    """
+    Adapt the analysis of a near-duplicate resume to a new text
+
+    The text-only skill and role stages are re-run so their results and
+    offsets match the new text. With nlp, personal info is extracted from the
+    new text, parsing only the prefix its spaCy-derived fields come from, so
+    nothing of the other resume's name, education or experience carries over.
+    Without it the spaCy-derived fields are kept and only email and phone are
+    re-extracted, which is only right when text is the text profile came from.
+
+    Args:
+        profile (dict): Result of analyze_profile() for the near-duplicate
+        text (str): Raw text of the new resume
+        nlp (spacy.language.Language): Loaded pipeline, to parse the new text
+
+    Returns:
+        dict: personal_info, skills and job_role_prediction
+    """
+    if nlp is not None:
+        sections = segment_sections(text)
+        with stage('nlp'):
+            doc = parse_text(nlp, text[:personal_info_prefix(text, sections)])
+        with stage('extract_info'):
+            info = extract_info(doc, text, sections)
+    else:
+        info = dict(profile['personal_info'], email=extract_email(text), phone=extract_phone(text))
+
+    with stage('extract_skills'):
+        skills_data = extract_skills(None, text)
+
+    with stage('predict_job_role'):
+        job_role_prediction = predict_job_role(text, skills_data['skills'])
+
+    return {
+        'personal_info': info,
+        'skills': skills_data,
+        'job_role_prediction': job_role_prediction
+    }
+
+
+def build_response(profile, text, job_description=''):
+    """
+    Combine a (possibly cached) profile with job description matching
+
+    Args:
+        profile (dict): Result of analyze_profile()
+        text (str): Raw text of the resume
+        job_description (str): Optional job description to match against
+
+    Returns:
+        dict: Analysis result in the /analyze response format
+    """
+    job_match = {}
+    if job_description:
+        with stage('match_job_description'):
+            job_match = match_job_description(text, job_description, profile['skills']['skills'])
+
+    return {
+        'personal_info': profile['personal_info'],
+        'skills': profile['skills'],
+        'job_match': job_match,
+        'job_role_prediction': profile['job_role_prediction'],
+        'taxonomy_version': taxonomy_registry.versions()
+    }
+
+
+def analyze_document(doc, text, job_description=''):
+    """
+    Run every analysis stage on an already parsed resume
+
+    Args:
+        doc (spacy.tokens.Doc): spaCy Doc object of resume text
+        text (str): Raw text of the resume
+        job_description (str): Optional job description to match against
+
+    Returns:
+        dict: Analysis result in the /analyze response format
+    """
+    return build_response(analyze_profile(doc, text), text, job_description)
+
+
+def taxonomy_cache_tag():
+    """Return a string identifying the loaded taxonomy versions, for use in cache keys"""
+    return ";".join(f"{name}={version}" for name, version in sorted(taxonomy_registry.versions().items()))
+
+
+def changed_skill_terms(old_skills, new_skills):
+    """
+    Return the skill terms whose presence in a resume makes extract_skills() output differ
+
+    Args:
+        old_skills (dict): Skills taxonomy a profile was computed under
+        new_skills (dict): Skills taxonomy now loaded
+
+    Returns:
+        set: Terms added to or removed from a category, plus every term of a
+            category whose remaining terms changed order
+    """
+    changed = set()
+    for category, _ in SKILL_CATEGORIES:
+        old = old_skills.get(category, [])
+        new = new_skills.get(category, [])
+        old_set, new_set = set(old), set(new)
+        changed |= old_set ^ new_set
+        # Categories are listed in taxonomy order, so a reordering can affect any of their terms
+        if [term for term in old if term in new_set] != [term for term in new if term in old_set]:
+            changed |= old_set | new_set
+    return changed
+
+
+def rescore_plan(old_taxonomies, taxonomies):
+    """
+    Work out what a re-score has to redo for profiles computed under old_taxonomies
+
+    Returns:
+        tuple: (KeywordMatcher over the changed skill terms, or None when every
+            resume needs its skills re-extracted; whether job roles changed)
+    """
+    if old_taxonomies is None or 'skills' not in old_taxonomies:
+        return None, True
+    terms = changed_skill_terms(old_taxonomies['skills'], taxonomies['skills'])
+    roles_changed = old_taxonomies.get('job_roles') != taxonomies.get('job_roles')
+    logger.info(f"Taxonomy change: {len(terms)} skill terms changed, job roles {'changed' if roles_changed else 'unchanged'}")
+    return KeywordMatcher(terms), roles_changed
+
+
+def rescore_profile(stored, plan, vocab):
+    """
+    Recompute a stored profile under the loaded taxonomies without parsing
+
+    Resumes that contain a changed skill term get the analysis stages re-run
+    on their stored Doc; the rest keep their skills, and only need a new
+    role prediction if the job roles changed.
+
+    Args:
+        stored (StoredResume): Row from the doc store
+        plan (tuple): Result of rescore_plan() for the row's taxonomy tag
+        vocab (spacy.vocab.Vocab): Vocab of the loaded pipeline, to restore the Doc
+
+    Returns:
+        tuple: (profile, "rescored", "roles" or "unchanged")
+    """
+    matcher, roles_changed = plan
+    profile = stored.profile
+    if matcher is None or matcher.find_all(stored.text.lower()):
+        if stored.doc_bytes is not None:
+            rescored = analyze_profile(doc_from_bytes(stored.doc_bytes, vocab), stored.text)
+        else:
+            rescored = refresh_profile(profile, stored.text)
+        if profile.get('near_duplicate'):
+            rescored['near_duplicate'] = profile['near_duplicate']
+        return rescored, 'rescored'
+    if roles_changed:
+        with stage('predict_job_role'):
+            job_role_prediction = predict_job_role(stored.text, profile['skills']['skills'])
+        return dict(profile, job_role_prediction=job_role_prediction), 'roles'
+    return profile, 'unchanged'
+
+
+def rescore_stored(doc_store, vocab, on_update=None, on_progress=None, batch_size=100):
+    """
+    Bring every stored profile up to date with the loaded taxonomies
+
+    Only resumes whose profile was computed under other taxonomy versions are
+    visited, and nothing is parsed again, so a taxonomy edit costs a keyword
+    scan per resume plus the cheap analysis stages for the resumes it affects.
+
+    Args:
+        doc_store (DocStore): Store of parsed resumes
+        vocab (spacy.vocab.Vocab): Vocab of the loaded pipeline
+        on_update (callable): Called with (resume_id, profile, filename) for every re-scored resume
+        on_progress (callable): Called with (done, total) after every batch
+        batch_size (int): Resumes read from and written to the store per batch
+
+    Returns:
+        dict: Counts of rescored, roles-only, unchanged and failed resumes
+    """
+    tag = taxonomy_cache_tag()
+    taxonomies = taxonomy_registry.snapshot()
+    doc_store.ensure_snapshot(tag, lambda: taxonomies)
+    total = doc_store.count_stale(tag)
+
+    counts = {'total': 0, 'rescored': 0, 'roles': 0, 'unchanged': 0, 'failed': 0}
+    plans = {}
+    for batch in doc_store.iter_stale(tag, batch_size):
+        updates = []
+        for stored in batch:
+            plan = plans.get(stored.taxonomy_tag)
+            if plan is None:
+                plan = plans[stored.taxonomy_tag] = rescore_plan(doc_store.snapshot(stored.taxonomy_tag), taxonomies)
+            try:
+                profile, kind = rescore_profile(stored, plan, vocab)
+                counts[kind] += 1
+                updates.append((stored.resume_id, profile, tag))
+                if on_update is not None:
+                    on_update(stored.resume_id, profile, stored.filename)
+            except Exception as e:
+                logger.error(f"Error re-scoring resume {stored.resume_id}: {str(e)}")
+                counts['failed'] += 1
+
+        counts['total'] += len(batch)
+        if updates:
+            doc_store.update_profiles(updates)
+        if on_progress is not None:
+            on_progress(counts['total'], max(total, counts['total']))
+
+    logger.info(
+        f"Re-scored {counts['total']} resumes: {counts['rescored']} re-analyzed, "
+        f"{counts['roles']} role predictions updated, {counts['unchanged']} unchanged, {counts['failed']} failed"
+    )
+    return counts
+
+
+def analyze_batch(nlp, items, job_description='', batch_size=16, n_process=1):
+    """
+    Analyze many resumes, parsing them with a single batched nlp.pipe call
+
+    Texts longer than NLP_CHUNK_CHARS are parsed in chunks after the batch.
+
+    Args:
+        nlp (spacy.language.Language): Loaded spaCy pipeline
+        items (list): (name, text) pairs; text may be None if extraction failed
+        job_description (str): Optional job description to match against
+        batch_size (int): Number of texts spaCy buffers per batch
+        n_process (int): Number of spaCy worker processes
+
+    Returns:
+        list: One {"filename", "result"} or {"filename", "error"} dict per item, in input order
+    """
+    results = [None] * len(items)
+    pending = []
+
+    for position, (name, text) in enumerate(items):
+        if not text:
+            results[position] = {'filename': name, 'error': 'Could not extract text from the resume'}
+        else:
+            pending.append((text, position))
+
+    try:
+        with stage('nlp_batch'):
+            docs = list(parse_many(nlp, pending, batch_size=batch_size, n_process=n_process))
+    except Exception as e:
+        # Fall back to one doc at a time so a single bad resume doesn't fail the batch
+        logger.error(f"Batched parsing failed, retrying documents individually: {str(e)}")
+        docs = []
+        for text, position in pending:
+            try:
+                docs.append((parse_text(nlp, text), position))
+            except Exception as doc_error:
+                results[position] = {'filename': items[position][0], 'error': f'Error parsing resume: {str(doc_error)}'}
+
+    for doc, position in docs:
+        name, text = items[position]
+        try:
+            results[position] = {'filename': name, 'result': analyze_document(doc, text, job_description)}
+        except Exception as e:
+            logger.error(f"Error analyzing {name}: {str(e)}", exc_info=True)
+            results[position] = {'filename': name, 'error': f'An error occurred during analysis: {str(e)}'}
+
+    return results
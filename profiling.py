@@ -0,0 +1,225 @@
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Directory for per-request profiles; profiling is off while it is unset
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+# Share of /analyze requests profiled at random
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+# Requests carrying this value in the X-Profile-Token header are always profiled; unset disables the header
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+# Seconds between stack samples
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))
+# Output formats: "speedscope" and/or "collapsed"
+PROFILE_FORMATS = [fmt.strip() for fmt in os.environ.get("PROFILE_FORMATS", "speedscope,collapsed").split(",") if fmt.strip()]
+
+PROFILE_HEADER = "X-Profile-Token"
+
+
+def should_profile(headers):
+    """
+    Decide whether to profile a request
+
+    Args:
+        headers (Mapping): Request headers
+
+    Returns:
+        bool: True if profiling is configured and the request carries the
+            profile token or is picked by the sampling rate
+    """
+    if not PROFILE_DIR:
+        return False
+    token = headers.get(PROFILE_HEADER)
+    if token and PROFILE_TOKEN and hmac.compare_digest(token, PROFILE_TOKEN):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class StackSampler:
+    """
+    Statistical profiler for one thread
+
+    A background thread records the target thread's Python stack every
+    interval seconds. Each sample is weighted by the time since the previous
+    one, so the profile reflects wall-clock time, including time spent
+    waiting (e.g. on the PDF page pool).
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL, skip_frames=0):
+        self.thread_id = thread_id
+        self.interval = interval
+        # Outermost frames of the target thread to leave out of every stack
+        self.skip_frames = skip_frames
+        # (stack, seconds) pairs; a stack is a tuple of (function, file, first line), outermost first
+        self.samples = []
+        self.started = None
+        self.stopped = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def _run(self):
+        last = self.started
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append((tuple(stack[self.skip_frames:]), now - last))
+            last = now
+
+    def collapsed(self, extra=None):
+        """
+        Return the samples as collapsed stacks ("a;b;c <microseconds>" per line), for flamegraph.pl
+
+        Args:
+            extra (dict): Other threads' samples by name (e.g. from pool
+                workers); each is added under a root frame of that name
+        """
+        totals = {}
+        groups = [("", self.samples)] + [(f"{name};", samples) for name, samples in (extra or {}).items()]
+        for prefix, samples in groups:
+            for stack, seconds in samples:
+                key = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+                if key:
+                    totals[prefix + key] = totals.get(prefix + key, 0) + seconds
+        return "".join(f"{key} {round(seconds * 1e6)}\n" for key, seconds in sorted(totals.items()))
+
+    def speedscope(self, name, extra=None):
+        """
+        Return the samples as a speedscope file with one sampled profile per thread
+
+        Args:
+            name (str): Name of the file and of this thread's profile
+            extra (dict): Other threads' samples by profile name (e.g. from pool workers)
+        """
+        frames = []
+        frame_ids = {}
+
+        def sampled_profile(profile_name, samples, end_value):
+            indices_list = []
+            weights = []
+            for stack, seconds in samples:
+                indices = []
+                for frame in stack:
+                    index = frame_ids.get(frame)
+                    if index is None:
+                        index = frame_ids[frame] = len(frames)
+                        frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                    indices.append(index)
+                indices_list.append(indices)
+                weights.append(seconds)
+            return {
+                "type": "sampled",
+                "name": profile_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": end_value,
+                "samples": indices_list,
+                "weights": weights
+            }
+
+        profiles = [sampled_profile(name, self.samples, (self.stopped or time.perf_counter()) - self.started)]
+        for profile_name, samples in (extra or {}).items():
+            profiles.append(sampled_profile(profile_name, samples, sum(seconds for _, seconds in samples)))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": name,
+            "activeProfileIndex": 0,
+            "exporter": "hirelens"
+        }
+
+
+class RequestProfile:
+    """
+    Context manager that samples the current thread and writes the profile on exit
+
+    The caller's frame is the root of every sampled stack. Tags can be added
+    while the block runs, e.g. once the file hash is known; a block that
+    raised is tagged with the exception type. Samples taken elsewhere for
+    the same request (e.g. by PDF page workers) can be added to
+    worker_samples and are written as a separate "workers" profile.
+    """
+
+    def __init__(self, tags=None):
+        self.tags = dict(tags or {})
+        self.sampler = None
+        self.name = None
+        self.worker_samples = []
+
+    def __enter__(self):
+        depth = 0
+        frame = sys._getframe(1)
+        while frame is not None:
+            depth += 1
+            frame = frame.f_back
+        self.sampler = StackSampler(threading.get_ident(), skip_frames=depth - 1)
+        self.sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.sampler.stop()
+        if exc_type is not None:
+            self.tags["error"] = exc_type.__name__
+        extra = {"workers": self.worker_samples} if self.worker_samples else None
+        self.name = write_profile(self.sampler, self.tags, extra=extra)
+        return False
+
+
+def write_profile(sampler, tags, directory=None, formats=None, extra=None):
+    """
+    Write a request profile to the profile directory
+
+    Files are named <timestamp>-<tag values> plus a per-format extension, so
+    a slow resume can be found by its hash, size or page count.
+
+    Args:
+        sampler (StackSampler): Finished sampler
+        tags (dict): e.g. {"hash": ..., "bytes": ..., "pages": ...}; None values are left out
+        directory (str): Output directory, PROFILE_DIR by default
+        formats (list): "speedscope" and/or "collapsed", PROFILE_FORMATS by default
+        extra (dict): Samples from other threads or processes, by name
+
+    Returns:
+        str: Base name of the written files, or None if nothing was written
+    """
+    directory = directory or PROFILE_DIR
+    formats = formats or PROFILE_FORMATS
+    label = "-".join(f"{key}={value}" for key, value in tags.items() if value is not None)
+    base = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{label}"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if "speedscope" in formats:
+            with open(os.path.join(directory, base + ".speedscope.json"), "w") as f:
+                json.dump(sampler.speedscope(label, extra), f)
+        if "collapsed" in formats:
+            with open(os.path.join(directory, base + ".collapsed.txt"), "w") as f:
+                f.write(sampler.collapsed(extra))
+    except OSError as e:
+        logger.error(f"Error writing profile {base}: {str(e)}")
+        return None
+    logger.info(f"Wrote profile {base} ({len(sampler.samples)} samples)")
+    return base
@@ -0,0 +1,207 @@
+import gzip
+import json
+import logging
+import os
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", "5"))
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css", "application/javascript"}
+
+
+def dumps(data):
+    """Serialize to compact JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def select_fields(data, fields):
+    """
+    Keep only the given dotted paths of a nested dict
+
+    Args:
+        data (dict): Response data
+        fields (list): Paths like "personal_info.name" or "job_match"
+
+    Returns:
+        dict: The selected subset; unknown paths are ignored
+    """
+    selected = {}
+    for field in fields:
+        source, target = data, selected
+        parts = field.split('.')
+        for index, part in enumerate(parts):
+            if not isinstance(source, dict) or part not in source:
+                break
+            if index == len(parts) - 1:
+                target[part] = source[part]
+            else:
+                source = source[part]
+                existing = target.get(part)
+                if not isinstance(existing, dict):
+                    # An earlier, shorter path may already hold the whole subtree
+                    if part in target:
+                        break
+                    existing = target[part] = {}
+                target = existing
+    return selected
+
+
+class TermTable:
+    """Assigns each distinct string an integer id, in order of first use"""
+
+    def __init__(self):
+        self.terms = []
+        self._ids = {}
+
+    def id(self, term):
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = self._ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def ids(self, terms):
+        return [self.id(term) for term in terms]
+
+
+def compact_result(result):
+    """
+    Rewrite an analysis result with skill and keyword strings replaced by term ids
+
+    Every skill and JD keyword appears once in the top-level "terms" list and
+    is referenced by its index elsewhere. Keyword contexts are dropped in
+    favour of their offsets, and the combined skills list only carries the
+    section-derived skills that aren't already technical or soft.
+
+    Args:
+        result (dict): Analysis result in the /analyze response format
+
+    Returns:
+        dict: Compact result
+    """
+    table = TermTable()
+    compact = {key: value for key, value in result.items() if key not in ('skills', 'job_match')}
+
+    skills = result.get('skills')
+    if skills:
+        categorized = set(skills.get('technical', [])) | set(skills.get('soft', []))
+        compact['skills'] = {
+            key: table.ids(skills.get(key, [])) for key in ('technical', 'soft', 'certifications', 'languages')
+        }
+        compact['skills']['other'] = table.ids(skill for skill in skills.get('skills', []) if skill not in categorized)
+        compact['skills']['positions'] = {
+            table.id(skill): spans for skill, spans in skills.get('positions', {}).items()
+        }
+        compact['skills'].update({key: value for key, value in skills.items() if key.endswith(('_count', '_percentage'))})
+
+    job_match = result.get('job_match')
+    if job_match:
+        compact['job_match'] = {
+            'match_percentage': job_match.get('match_percentage'),
+            'matched': table.ids(job_match.get('matched_keywords', [])),
+            'missing': table.ids(job_match.get('missing_keywords', [])),
+            'offsets': {
+                table.id(detail['keyword']): detail.get('offsets', [])
+                for detail in job_match.get('matched_details', []) if detail.get('found')
+            }
+        }
+    elif job_match is not None:
+        compact['job_match'] = job_match
+
+    compact['terms'] = table.terms
+    return compact
+
+
+def shape_result(result, args):
+    """
+    Apply ?compact= and ?fields= to one analysis result
+
+    Args:
+        result (dict): Analysis result
+        args (Mapping): Request query arguments
+
+    Returns:
+        dict: Shaped result
+    """
+    is_compact = args.get('compact') == '1'
+    if is_compact:
+        result = compact_result(result)
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+    if fields:
+        if is_compact:
+            # Term ids are meaningless without their table
+            fields.append('terms')
+        result = select_fields(result, fields)
+    return result
+
+
+def json_response(data, status=200):
+    """Build a JSON response with the fast encoder"""
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+
+def _accepted_encodings(header):
+    """Parse Accept-Encoding into {coding: q}"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def compress_response(response, accept_encoding):
+    """
+    Compress a response body with brotli or gzip when the client accepts it
+
+    Streamed responses (e.g. server-sent events), small bodies and
+    non-textual content are left alone.
+    """
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    accepted = _accepted_encodings(accept_encoding or '')
+    if brotli is not None and accepted.get('br', 0) > 0:
+        encoding = 'br'
+    elif accepted.get('gzip', 0) > 0:
+        encoding = 'gzip'
+    else:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    if encoding == 'br':
+        body = brotli.compress(body, quality=COMPRESS_LEVEL)
+    else:
+        body = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -1,17 +1,22 @@
+import bisect
 import logging
 import re
-import PyPDF2
-import docx2txt
 from spacy.tokens import Doc
 
+from docx_extractor import DocxLimitError, extract_docx
+from metrics import current_timings, document_pages, text_length
+from pdf_extractor import PageTimeout, extract_pdf, extract_pdf_with_pdfminer
+from sections import segment_sections
+
 logger = logging.getLogger(__name__)
 
-def extract_text(file_path, file_extension):
+def extract_text(file, file_extension):
     """
     Extract text content from resume files
     
     Args:
-        file_path (str): Path to the resume file
+        file (str or file object): Path to the resume file, or a seekable binary
+            file object such as an in-memory or spooled upload
         file_extension (str): File extension (pdf or docx)
         
     Returns:
@@ -19,55 +24,77 @@ def extract_text(file_path, file_extension):
     """
     try:
         if file_extension == 'pdf':
-            return extract_text_from_pdf(file_path)
+            text = extract_text_from_pdf(file)
         elif file_extension == 'docx':
-            return extract_text_from_docx(file_path)
+            text = extract_text_from_docx(file)
         else:
             logger.error(f"Unsupported file extension: {file_extension}")
             return None
+        if text:
+            text_length.observe(len(text), file_type=file_extension)
+        return text
     except Exception as e:
-        logger.error(f"Error extracting text from {file_path}: {str(e)}")
+        logger.error(f"Error extracting text from {describe_file(file)}: {str(e)}")
         return None
 
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF files"""
-    text = ""
+def describe_file(file):
+    """Return a printable name for a path or file object"""
+    return file if isinstance(file, str) else getattr(file, 'name', '<upload>')
+
+
+def rewind(file):
+    """Seek a file object back to the start; paths are returned unchanged"""
+    if not isinstance(file, str):
+        file.seek(0)
+    return file
+
+
+def extract_text_from_pdf(file):
+    """Extract text from PDF files (path or seekable file object)"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+        # Pages are extracted in parallel under per-page and per-document time budgets
+        report = extract_pdf(rewind(file))
+        document_pages.observe(report["page_count"], file_type="pdf")
+        timings = current_timings()
+        if timings is not None:
+            timings.note('pages', report["page_count"])
+        return report["text"]
+    except PageTimeout:
+        # Not worth a second budget in pdfminer
+        logger.error("PDF could not be opened within its time budget")
+        return None
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
-        # If PyPDF2 fails, try with pdfminer as fallback
+        # If PyPDF2 fails, try with pdfminer as fallback, under a document budget of its own
         try:
-            from pdfminer.high_level import extract_text as extract_text_pdfminer
-            text = extract_text_pdfminer(file_path)
-            return text
+            return extract_pdf_with_pdfminer(rewind(file))
         except Exception as e2:
             logger.error(f"Fallback extraction also failed: {str(e2)}")
             return None
 
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX files"""
+def extract_text_from_docx(file):
+    """Extract text from DOCX files (path or seekable file object)"""
     try:
-        text = docx2txt.process(file_path)
-        return text
+        # Streams the text parts under decompressed-size and ratio limits
+        return extract_docx(rewind(file))
+    except DocxLimitError as e:
+        logger.warning(f"Rejected DOCX {describe_file(file)}: {str(e)}")
+        return None
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         return None
 
 
-def extract_info(doc, text):
+def extract_info(doc, text, sections=None):
     """
     Extract structured information from resume
     
     Args:
         doc (spacy.tokens.Doc): spaCy Doc object of resume text
         text (str): Raw text of the resume
+        sections (SectionIndex): Sections from segment_sections(), computed if not given
         
     Returns:
         dict: Structured information from resume
@@ -76,8 +103,8 @@ def extract_info(doc, text):
         'name': extract_name(doc),
         'email': extract_email(text),
         'phone': extract_phone(text),
-        'education': extract_education(doc, text),
-        'experience': extract_experience(doc, text)
+        'education': extract_education(doc, text, sections),
+        'experience': extract_experience(doc, text, sections)
     }
     return info
 
@@ -115,49 +142,56 @@ def extract_phone(text):
     return phones[0] if phones else "Phone not detected"
 
 
-def extract_education(doc, text):
+def entities_in_range(doc, start_char, end_char, label):
+    """
+    Return the text of entities with the given label inside a character range of doc
+
+    Reuses the entities already recognised on the full document instead of
+    running the pipeline again on the substring.
+    """
+    span = doc.char_span(start_char, end_char, alignment_mode="expand")
+    if span is None:
+        return []
+    return [ent.text for ent in span.ents if ent.label_ == label]
+
+
+def extract_education(doc, text, sections=None):
     """Extract education information from resume"""
     education_keywords = ["education", "university", "college", "degree", "bachelor", "master", "phd", "diploma"]
     education_info = []
     
-    # Look for education section
-    lines = text.split('\n')
-    is_education_section = False
-    education_section_text = ""
+    # Join the education section lines, keeping (offset in education_section_text, offset in text) per line
+    if sections is None:
+        sections = segment_sections(text)
+    education_section_text, section_offsets = sections.join("education", " ")
     
-    for line in lines:
-        line_lower = line.lower()
-        # Check if this line is an education section header
-        if any(keyword in line_lower for keyword in ["education", "qualification"]) and len(line) < 50:
-            is_education_section = True
-            continue
-            
-        # End of education section if we hit another section header
-        if is_education_section and line.strip() and line[0].isupper() and len(line) < 50 and all(keyword not in line_lower for keyword in education_keywords):
-            next_word = line.split()[0].lower() if line.split() else ""
-            if next_word in ["experience", "work", "employment", "skills", "projects"]:
-                is_education_section = False
-                
-        if is_education_section and line.strip():
-            education_section_text += line + " "
+    def to_text_offset(section_offset):
+        """Map an offset in education_section_text back to an offset in text"""
+        index = bisect.bisect_right(section_offsets, (section_offset, len(text))) - 1
+        section_start, text_start = section_offsets[index]
+        return text_start + (section_offset - section_start)
     
     # If we found an education section, extract details
     if education_section_text:
         # Look for degree names and institutions
         degree_keywords = ["bachelor", "master", "phd", "b.tech", "m.tech", "bsc", "msc", "diploma"]
+        next_sentence_start = 0
         for sentence in education_section_text.split('. '):
+            sentence_start = next_sentence_start
+            next_sentence_start += len(sentence) + 2
+            
             # Check if sentence likely contains education info
             if any(keyword in sentence.lower() for keyword in education_keywords):
                 # Extract the year if present
                 years = re.findall(r'\b(19|20)\d{2}\b', sentence)
                 year = years[0] if years else ""
                 
-                # Find educational institutions (ORG entities)
+                # Find educational institutions (ORG entities) from the already parsed doc
                 orgs = []
-                doc_sentence = doc(sentence)
-                for ent in doc_sentence.ents:
-                    if ent.label_ == "ORG":
-                        orgs.append(ent.text)
+                if sentence.strip():
+                    start_char = to_text_offset(sentence_start)
+                    end_char = to_text_offset(sentence_start + len(sentence) - 1) + 1
+                    orgs = entities_in_range(doc, start_char, min(end_char, len(text)), "ORG")
                 
                 institution = orgs[0] if orgs else ""
                 
@@ -184,46 +218,23 @@ def extract_education(doc, text):
     return education_info
 
 
-def extract_experience(doc, text):
+def extract_experience(doc, text, sections=None):
     """Extract work experience information from resume"""
-    experience_keywords = ["experience", "work", "employment", "career"]
     experience_info = []
     
-    # Look for experience section
-    lines = text.split('\n')
-    is_experience_section = False
-    current_entry = ""
-    
-    for line in lines:
-        line_lower = line.lower()
-        # Check if this line is an experience section header
-        if any(keyword in line_lower for keyword in experience_keywords) and len(line) < 50:
-            is_experience_section = True
-            continue
-            
-        # End of experience section if we hit another section header
-        if is_experience_section and line.strip() and line[0].isupper() and len(line) < 50:
-            next_word = line.split()[0].lower() if line.split() else ""
-            if next_word in ["education", "skills", "projects", "achievements"]:
-                if current_entry.strip():
-                    experience_info.append({"description": current_entry.strip()})
-                    current_entry = ""
-                is_experience_section = False
-                
-        # Process experience section content
-        if is_experience_section:
-            # Check if this line starts a new entry (company or position)
-            if line.strip() and (line[0].isupper() or re.match(r'^\d{4}', line)):
-                if current_entry.strip():
-                    experience_info.append({"description": current_entry.strip()})
-                    current_entry = ""
-                current_entry = line + " "
-            elif line.strip():
-                current_entry += line + " "
+    if sections is None:
+        sections = segment_sections(text)
     
-    # Add the last entry if exists
-    if is_experience_section and current_entry.strip():
-        experience_info.append({"description": current_entry.strip()})
+    for section in sections.get("experience"):
+        entry_lines = []
+        for _, line in section.lines:
+            # A line starting with a capital or a year begins a new entry (company or position)
+            if (line[0].isupper() or re.match(r'^\d{4}', line)) and entry_lines:
+                experience_info.append({"description": " ".join(entry_lines).strip()})
+                entry_lines = []
+            entry_lines.append(line)
+        if entry_lines:
+            experience_info.append({"description": " ".join(entry_lines).strip()})
         
     # If no structured info found, extract sentences with work-related terms
     if not experience_info:
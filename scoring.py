@@ -0,0 +1,259 @@
+import logging
+import re
+
+import numpy as np
+from scipy import sparse
+
+from job_matcher import JobProfile, compile_job_profile
+from skill_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+WEIGHTINGS = ("tfidf", "bm25")
+
+_token_pattern = re.compile(r'\w+')
+
+
+class ResumeTermMatrix:
+    """
+    Sparse term statistics for a set of resumes over a fixed vocabulary
+
+    presence[i, t] is 1 when term t occurs (word-bounded) in resume i or in its
+    skills list, the rule match_job_description uses; counts[i, t] is the
+    number of occurrences, used for TF-IDF/BM25 weighting.
+    """
+
+    def __init__(self, presence, counts, lengths):
+        self.presence = presence
+        self.counts = counts
+        self.lengths = lengths
+
+    def __len__(self):
+        return self.presence.shape[0]
+
+    @classmethod
+    def stack(cls, matrices):
+        return cls(
+            sparse.vstack([m.presence for m in matrices], format="csr"),
+            sparse.vstack([m.counts for m in matrices], format="csr"),
+            np.concatenate([m.lengths for m in matrices])
+        )
+
+
+class BatchScorer:
+    """
+    Scores many resumes against many job descriptions with sparse matrix products
+
+    The JDs are compiled once into a shared keyword vocabulary and a binary
+    JD x term matrix. Resumes are turned into sparse term vectors with one
+    word-bounded multi-pattern scan each, after which the whole M x N score matrix is a
+    handful of sparse products instead of M * N calls to match_job_description.
+    """
+
+    def __init__(self, job_descriptions, weighting="bm25", k1=1.2, b=0.75):
+        """
+        Args:
+            job_descriptions (list): Job description texts, or already compiled JobProfiles
+            weighting (str): "tfidf" or "bm25"
+            k1 (float): BM25 term frequency saturation
+            b (float): BM25 length normalisation
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting {weighting!r}, expected one of {WEIGHTINGS}")
+        self.weighting = weighting
+        self.k1 = k1
+        self.b = b
+
+        profiles = [
+            job_description if isinstance(job_description, JobProfile) else compile_job_profile(job_description)
+            for job_description in job_descriptions
+        ]
+        self.vocabulary = {}
+        rows, cols = [], []
+        for row, profile in enumerate(profiles):
+            for keyword in profile.keywords:
+                col = self.vocabulary.setdefault(keyword, len(self.vocabulary))
+                rows.append(row)
+                cols.append(col)
+
+        self.terms = list(self.vocabulary)
+        self.job_terms = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(profiles), len(self.vocabulary))
+        )
+        self.job_keyword_counts = np.asarray(self.job_terms.sum(axis=1)).ravel()
+        self.matcher = KeywordMatcher(self.terms, word_boundary="edges")
+
+    def vectorize(self, resume_texts, resume_skills=None):
+        """
+        Build sparse term vectors for resumes
+
+        Args:
+            resume_texts (list): Resume texts
+            resume_skills (list): Optional list of extracted skills lists, one per resume
+
+        Returns:
+            ResumeTermMatrix: Presence and count matrices plus token lengths
+        """
+        presence_rows, presence_cols = [], []
+        count_rows, count_cols, count_values = [], [], []
+        lengths = np.zeros(len(resume_texts), dtype=np.float32)
+
+        for row, text in enumerate(resume_texts):
+            text_lower = text.lower()
+            lengths[row] = len(_token_pattern.findall(text_lower))
+
+            counts = {}
+            for _, _, keyword in self.matcher.iter_matches(text_lower):
+                col = self.vocabulary[keyword]
+                counts[col] = counts.get(col, 0) + 1
+            present = set(counts)
+            if resume_skills is not None:
+                present.update(self.vocabulary[skill] for skill in resume_skills[row] if skill in self.vocabulary)
+
+            presence_rows.extend([row] * len(present))
+            presence_cols.extend(present)
+            count_rows.extend([row] * len(counts))
+            count_cols.extend(counts)
+            count_values.extend(counts.values())
+
+        shape = (len(resume_texts), len(self.vocabulary))
+        presence = sparse.csr_matrix(
+            (np.ones(len(presence_rows), dtype=np.float32), (presence_rows, presence_cols)), shape=shape
+        )
+        counts = sparse.csr_matrix(
+            (np.asarray(count_values, dtype=np.float32), (count_rows, count_cols)), shape=shape
+        )
+        return ResumeTermMatrix(presence, counts, lengths)
+
+    def idf(self, resumes):
+        """Inverse document frequencies of the vocabulary over a resume corpus"""
+        n = len(resumes)
+        df = np.bincount(resumes.counts.indices, minlength=len(self.vocabulary)).astype(np.float32)
+        if self.weighting == "bm25":
+            return np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        return (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+    def weight(self, resumes, idf, average_length=None):
+        """Apply TF-IDF (L2-normalised) or BM25 term weights to resume counts"""
+        counts = resumes.counts.tocsr(copy=True)
+        if self.weighting == "bm25":
+            if average_length is None:
+                average_length = float(resumes.lengths.mean()) if len(resumes) else 0.0
+            norms = self.k1 * (1 - self.b + self.b * resumes.lengths / max(average_length, 1.0))
+            row_norms = np.repeat(norms, np.diff(counts.indptr))
+            tf = counts.data
+            counts.data = idf[counts.indices] * tf * (self.k1 + 1) / (tf + row_norms)
+            return counts
+
+        counts.data = counts.data * idf[counts.indices]
+        row_lengths = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+        row_lengths[row_lengths == 0] = 1
+        return sparse.diags(1 / row_lengths).dot(counts).tocsr()
+
+    def job_vectors(self, idf):
+        """JD vectors in the same weighting space as the resumes"""
+        if self.weighting == "bm25":
+            return self.job_terms
+        weighted = self.job_terms.multiply(idf).tocsr()
+        row_lengths = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        row_lengths[row_lengths == 0] = 1
+        return sparse.diags(1 / row_lengths).dot(weighted).tocsr()
+
+    def score(self, resume_texts, resume_skills=None):
+        """
+        Score every resume against every job description
+
+        Args:
+            resume_texts (list): Resume texts
+            resume_skills (list): Optional list of extracted skills lists, one per resume
+
+        Returns:
+            dict: match_percentage (M x N int array, same values as
+                match_job_description) and score (M x N float array of
+                TF-IDF cosine or BM25 scores)
+        """
+        resumes = self.vectorize(resume_texts, resume_skills)
+        idf = self.idf(resumes)
+        return {
+            "match_percentage": self.match_percentage(resumes),
+            "score": self.relevance(resumes, idf)
+        }
+
+    def match_percentage(self, resumes):
+        """Share of each JD's keywords present in each resume, rounded like match_job_description"""
+        matched = resumes.presence.dot(self.job_terms.T).toarray().astype(np.float64)
+        totals = np.maximum(self.job_keyword_counts, 1).astype(np.float64)
+        # round() in match_job_description rounds halves to even, as does np.rint
+        return np.rint(matched / totals * 100).astype(np.int32)
+
+    def relevance(self, resumes, idf, average_length=None):
+        """TF-IDF cosine similarity or BM25 score of each resume for each JD"""
+        weighted = self.weight(resumes, idf, average_length)
+        return weighted.dot(self.job_vectors(idf).T).toarray()
+
+    def top_k(self, resume_texts, resume_skills=None, k=50, chunk_size=5000, rank_by="score"):
+        """
+        Best k resumes for every job description, scoring in bounded-memory chunks
+
+        IDF and average length are computed over the whole corpus first, then
+        chunk_size x N dense blocks are scored and merged into running top-k sets.
+
+        Args:
+            resume_texts (list): Resume texts
+            resume_skills (list): Optional list of extracted skills lists
+            k (int): Resumes to keep per job description
+            chunk_size (int): Resumes scored per block
+            rank_by (str): "score" or "match_percentage"
+
+        Returns:
+            list: Per JD, a list of (resume index, score, match_percentage) tuples, best first
+        """
+        chunks = [
+            self.vectorize(
+                resume_texts[start:start + chunk_size],
+                resume_skills[start:start + chunk_size] if resume_skills is not None else None
+            )
+            for start in range(0, len(resume_texts), chunk_size)
+        ]
+        if not chunks:
+            return [[] for _ in range(self.job_terms.shape[0])]
+        corpus = ResumeTermMatrix.stack(chunks)
+        idf = self.idf(corpus)
+        average_length = float(corpus.lengths.mean())
+
+        n_jobs = self.job_terms.shape[0]
+        best_index = np.empty((0, n_jobs), dtype=np.int64)
+        best_score = np.empty((0, n_jobs), dtype=np.float64)
+        best_match = np.empty((0, n_jobs), dtype=np.int32)
+        offset = 0
+
+        for chunk in chunks:
+            scores = self.relevance(chunk, idf, average_length)
+            matches = self.match_percentage(chunk)
+            indices = np.broadcast_to(np.arange(offset, offset + len(chunk))[:, None], scores.shape)
+            offset += len(chunk)
+
+            best_index = np.vstack([best_index, indices])
+            best_score = np.vstack([best_score, scores])
+            best_match = np.vstack([best_match, matches])
+            if best_index.shape[0] > k:
+                key = best_score if rank_by == "score" else best_match
+                # A full sort rather than argpartition, so resumes tied at the cut-off
+                # are kept by lowest index whatever the chunking
+                keep = np.lexsort((best_index, -key), axis=0)[:k]
+                best_index = np.take_along_axis(best_index, keep, axis=0)
+                best_score = np.take_along_axis(best_score, keep, axis=0)
+                best_match = np.take_along_axis(best_match, keep, axis=0)
+
+        key = best_score if rank_by == "score" else best_match
+        # Sort each JD's survivors best first, lower resume index first among equal scores
+        order = np.lexsort((best_index, -key), axis=0)
+        results = []
+        for job in range(n_jobs):
+            column = order[:, job]
+            results.append([
+                (int(best_index[i, job]), float(best_score[i, job]), int(best_match[i, job]))
+                for i in column
+            ])
+        return results
@@ -0,0 +1,164 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Section:
+    """A run of resume lines under one section header"""
+
+    def __init__(self, name, header, start):
+        self.name = name
+        self.header = header
+        self.start = start
+        self.end = start
+        # (offset in the resume text, line) for every non-empty line in the section
+        self.lines = []
+
+    def to_dict(self):
+        return {"name": self.name, "header": self.header, "start": self.start, "end": self.end, "lines": len(self.lines)}
+
+
+class SectionRule:
+    """
+    Header and end-of-section heuristics for one kind of section
+
+    A line starts the section when is_header(line) is true. An active section
+    ends at a short capitalised line whose first word is in end_words, unless
+    the line contains one of keep_words. After max_sections sections the rule
+    stops looking for headers.
+    """
+
+    def __init__(self, name, is_header, end_words, keep_words=(), max_sections=None):
+        self.name = name
+        self.is_header = is_header
+        self.end_words = set(end_words)
+        self.keep_words = keep_words
+        self.max_sections = max_sections
+
+    def is_end(self, line, line_lower):
+        if not line.strip() or not line[0].isupper() or len(line) >= 50:
+            return False
+        if any(keyword in line_lower for keyword in self.keep_words):
+            return False
+        return line.split()[0].lower() in self.end_words
+
+
+def _is_education_header(line):
+    line_lower = line.lower()
+    return any(keyword in line_lower for keyword in ["education", "qualification"]) and len(line) < 50
+
+
+def _is_experience_header(line):
+    line_lower = line.lower()
+    return any(keyword in line_lower for keyword in ["experience", "work", "employment", "career"]) and len(line) < 50
+
+
+def _is_skills_header(line):
+    line_lower = line.lower().strip()
+    return (line_lower == "skills" or
+            line_lower == "technical skills" or
+            line_lower.startswith("skills:") or
+            line_lower.startswith("technical skills:") or
+            "core skills" in line_lower) and len(line) < 50
+
+
+SECTION_RULES = [
+    SectionRule(
+        "education", _is_education_header,
+        end_words=["experience", "work", "employment", "skills", "projects"],
+        keep_words=["education", "university", "college", "degree", "bachelor", "master", "phd", "diploma"]
+    ),
+    SectionRule(
+        "experience", _is_experience_header,
+        end_words=["education", "skills", "projects", "achievements"]
+    ),
+    SectionRule(
+        "skills", _is_skills_header,
+        end_words=["experience", "education", "projects", "certifications", "languages"],
+        max_sections=1
+    ),
+]
+
+
+class SectionIndex:
+    """Sections found in a resume, by section name"""
+
+    def __init__(self, sections):
+        self.sections = sections
+
+    def get(self, name):
+        return [section for section in self.sections if section.name == name]
+
+    def lines(self, name):
+        return [entry for section in self.get(name) for entry in section.lines]
+
+    def join(self, name, separator):
+        """
+        Concatenate a section's lines, each followed by separator
+
+        Returns:
+            tuple: (joined text, list of (offset in joined text, offset in resume text) per line)
+        """
+        offsets = []
+        parts = []
+        length = 0
+        for text_offset, line in self.lines(name):
+            offsets.append((length, text_offset))
+            parts.append(line)
+            length += len(line) + len(separator)
+        return "".join(part + separator for part in parts), offsets
+
+    def to_dict(self):
+        return [section.to_dict() for section in self.sections]
+
+
+def segment_sections(text, rules=SECTION_RULES):
+    """
+    Walk the resume once and locate every section the rules describe
+
+    Args:
+        text (str): Raw text of the resume
+        rules (list): SectionRule objects to apply
+
+    Returns:
+        SectionIndex: Sections in order of their headers
+    """
+    sections = []
+    current = {rule.name: None for rule in rules}
+    counts = {rule.name: 0 for rule in rules}
+    line_start = 0
+
+    for line in text.split('\n'):
+        line_offset = line_start
+        line_start += len(line) + 1
+        line_lower = line.lower()
+        stripped = line.strip()
+
+        for rule in rules:
+            section = current[rule.name]
+            if rule.max_sections is not None and section is None and counts[rule.name] >= rule.max_sections:
+                continue
+
+            # A header opens the section, or is skipped if it's already open
+            if rule.is_header(line):
+                if section is None:
+                    section = Section(rule.name, stripped, min(line_start, len(text)))
+                    current[rule.name] = section
+                    counts[rule.name] += 1
+                    sections.append(section)
+                section.end = min(line_start, len(text))
+                continue
+
+            if section is None:
+                continue
+
+            if rule.is_end(line, line_lower):
+                section.end = line_offset
+                current[rule.name] = None
+                continue
+
+            if stripped:
+                section.lines.append((line_offset, line))
+            section.end = min(line_start, len(text))
+
+    return SectionIndex(sections)
@@ -0,0 +1,219 @@
+import logging
+import re
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+def is_word_char(ch):
+    """Return True if ch counts as a word character for regex \\b purposes"""
+    return ch.isalnum() or ch == '_'
+
+
+def is_word_boundary(text, index):
+    """
+    Check whether a regex word boundary (\\b) sits at the given offset
+
+    Args:
+        text (str): Text being searched
+        index (int): Offset between text[index - 1] and text[index]
+
+    Returns:
+        bool: True if exactly one side of the offset is a word character
+    """
+    before = index > 0 and is_word_char(text[index - 1])
+    after = index < len(text) and is_word_char(text[index])
+    return before != after
+
+
+def keyword_edge_pattern(keyword):
+    """
+    Build the regex equivalent of matching a keyword with word_boundary="edges"
+
+    A boundary is only required on a side where the keyword itself starts or
+    ends with a word character, so "java" doesn't match inside "javascript"
+    while "c++", "c#" and ".net" still match before punctuation or spaces.
+
+    Args:
+        keyword (str): Keyword to search for
+
+    Returns:
+        str: Regex pattern
+    """
+    pattern = re.escape(keyword)
+    if is_word_char(keyword[:1]):
+        pattern = r'(?<!\w)' + pattern
+    if is_word_char(keyword[-1:]):
+        pattern = pattern + r'(?!\w)'
+    return pattern
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton that finds many keywords in a single pass over text
+
+    The automaton is built once from a keyword list and can then be reused for
+    any number of texts. With word_boundary enabled a hit is only reported when
+    it would also match r'\\b' + re.escape(keyword) + r'\\b', so results are
+    identical to running one regex per keyword. With word_boundary="edges" a
+    boundary is only required where the keyword's own edge character is a
+    word character, matching keyword_edge_pattern(); use it for terms such
+    as "c++" or ".net" that \\b could never delimit.
+
+    Matchers are shared between request threads, the analysis pool and job
+    workers. Keywords passed to the constructor are compiled straight away;
+    after add() the automaton is rebuilt under a lock before the next scan, or
+    eagerly with build() before the matcher is published to other threads.
+    """
+
+    def __init__(self, keywords=(), word_boundary=True):
+        self.word_boundary = word_boundary
+        self._goto = [{}]
+        # Keyword ids ending exactly at each node; _out adds those reachable through failure links
+        self._terminal = [[]]
+        self._fail = [0]
+        self._out = [[]]
+        self._keywords = []
+        self._keyword_ids = {}
+        self._payloads = []
+        self._built = False
+        self._lock = threading.Lock()
+
+        for keyword in keywords:
+            self.add(keyword)
+        self.build()
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def __contains__(self, keyword):
+        return keyword in self._keyword_ids
+
+    def add(self, keyword, payload=None):
+        """
+        Add a keyword to the automaton
+
+        Args:
+            keyword (str): Keyword to search for (matched case-sensitively)
+            payload: Optional value attached to the keyword, returned by payloads()
+        """
+        if not keyword:
+            return
+
+        with self._lock:
+            self._add(keyword, payload)
+
+    def _add(self, keyword, payload):
+        keyword_id = self._keyword_ids.get(keyword)
+        if keyword_id is None:
+            keyword_id = len(self._keywords)
+            self._keyword_ids[keyword] = keyword_id
+            self._keywords.append(keyword)
+            self._payloads.append([])
+
+            node = 0
+            for ch in keyword:
+                next_node = self._goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._terminal.append([])
+                    self._goto[node][ch] = next_node
+                node = next_node
+            self._terminal[node].append(keyword_id)
+            self._built = False
+
+        if payload is not None:
+            self._payloads[keyword_id].append(payload)
+
+    def payloads(self, keyword):
+        """Return the payloads attached to a keyword"""
+        keyword_id = self._keyword_ids.get(keyword)
+        return self._payloads[keyword_id] if keyword_id is not None else []
+
+    def build(self):
+        """Compile the automaton now if keywords were added since the last build"""
+        if self._built:
+            return
+        with self._lock:
+            if not self._built:
+                self._build()
+
+    def _build(self):
+        """Compute failure links and merged outputs breadth-first, from scratch"""
+        goto = self._goto
+        fail = [0] * len(goto)
+        out = [list(keyword_ids) for keyword_ids in self._terminal]
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                fallback = fail[node]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(ch, 0)
+                if fail[child] == child:
+                    fail[child] = 0
+                out[child] = out[child] + out[fail[child]]
+
+        # Publish the finished tables before marking the automaton built
+        self._fail = fail
+        self._out = out
+        self._built = True
+
+    def iter_matches(self, text):
+        """
+        Scan text once and yield every keyword occurrence
+
+        Args:
+            text (str): Text to scan
+
+        Yields:
+            tuple: (start, end, keyword) character offsets of each hit
+        """
+        self.build()
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        keywords = self._keywords
+        edges = self.word_boundary == "edges"
+        node = 0
+
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+
+            end = i + 1
+            for keyword_id in out[node]:
+                keyword = keywords[keyword_id]
+                start = end - len(keyword)
+                if edges:
+                    if is_word_char(keyword[0]) and start > 0 and is_word_char(text[start - 1]):
+                        continue
+                    if is_word_char(keyword[-1]) and end < len(text) and is_word_char(text[end]):
+                        continue
+                elif self.word_boundary and not (is_word_boundary(text, start) and is_word_boundary(text, end)):
+                    continue
+                yield start, end, keyword
+
+    def find_all(self, text):
+        """
+        Find every keyword in text
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            dict: Keyword -> list of (start, end) offsets, in order of appearance
+        """
+        positions = {}
+        for start, end, keyword in self.iter_matches(text):
+            positions.setdefault(keyword, []).append((start, end))
+        return positions
@@ -11,6 +11,18 @@ document.addEventListener('DOMContentLoaded', () => {
     const analyticsSection = document.getElementById('analyticsSection');
     const errorAlert = document.getElementById('errorAlert');
     const errorMessage = document.getElementById('errorMessage');
+    const loadingMessage = document.getElementById('loadingMessage');
+    const defaultLoadingMessage = loadingMessage.textContent;
+    
+    // Human-readable labels for analysis job stages
+    const stageMessages = {
+        queued: 'Waiting for an available analyzer...',
+        running: 'Starting analysis...',
+        extracting_text: 'Extracting text from your resume...',
+        parsing: 'Reading your resume...',
+        analyzing: 'Extracting skills, education and experience...',
+        matching: 'Matching against job roles...'
+    };
     
     // Set up drag and drop functionality
     setupDragAndDrop();
@@ -46,8 +58,8 @@ document.addEventListener('DOMContentLoaded', () => {
         showLoading();
         
         try {
-            // Send the file to the server for analysis
-            const response = await fetch('/analyze', {
+            // Queue the file for analysis and wait for the job to finish
+            const response = await fetch('/analyze?async=1', {
                 method: 'POST',
                 body: formData
             });
@@ -57,7 +69,8 @@ document.addEventListener('DOMContentLoaded', () => {
                 throw new Error(errorData.error || 'Error analyzing resume');
             }
             
-            const data = await response.json();
+            const job = await response.json();
+            const data = await pollJob(job);
             
             // Display the results
             displayResults(data);
@@ -141,6 +154,7 @@ document.addEventListener('DOMContentLoaded', () => {
     
     // Function to show loading spinner
     function showLoading() {
+        loadingMessage.textContent = defaultLoadingMessage;
         loadingSpinner.classList.remove('d-none');
         resultsSection.classList.add('d-none');
     }
@@ -150,6 +164,30 @@ document.addEventListener('DOMContentLoaded', () => {
         loadingSpinner.classList.add('d-none');
     }
     
+    // Function to show the current analysis stage under the spinner
+    function showStage(stage) {
+        loadingMessage.textContent = stageMessages[stage] || defaultLoadingMessage;
+    }
+    
+    // Function to poll an analysis job until it finishes; polling doesn't hold
+    // a server thread between checks the way an event stream would
+    async function pollJob(job) {
+        while (true) {
+            const response = await fetch(job.status_url);
+            const status = await response.json();
+            
+            if (!response.ok || status.status === 'failed') {
+                throw new Error(status.error || 'Error analyzing resume');
+            }
+            if (status.status === 'done') {
+                return status.result;
+            }
+            
+            showStage(status.stage);
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+    
     // Function to show error message
     function showError(message) {
         errorMessage.textContent = message;
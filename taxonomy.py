@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stat() calls on a taxonomy file; keeps hot reload cheap on network filesystems
+TAXONOMY_CHECK_INTERVAL = float(os.environ.get("TAXONOMY_CHECK_INTERVAL", "2"))
+
+
+class TaxonomyEntry:
+    """A loaded taxonomy together with the version it was loaded from"""
+
+    def __init__(self, data, version, signature=None):
+        self.data = data
+        self.version = version
+        self.signature = signature
+        self.checked_at = time.monotonic()
+
+
+class TaxonomyRegistry:
+    """
+    Process-wide cache of the JSON taxonomies under static/data
+
+    Each taxonomy is parsed once and kept in memory. On access the file's
+    mtime and size are re-checked (at most every check_interval seconds) and
+    the taxonomy is reloaded when they change, so edits are picked up without
+    a restart. The version is a short content hash of the loaded file.
+
+    The returned data is shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, check_interval=TAXONOMY_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._sources = {}
+        self._entries = {}
+        # Outcome of the last compile of each taxonomy into its matcher, for readiness checks
+        self._builds = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, path, default, fallback):
+        """
+        Register a taxonomy file
+
+        Args:
+            name (str): Registry key, e.g. "skills"
+            path (str): Path to the JSON file
+            default (callable): Returns the data to use when the file does not exist
+            fallback (callable): Returns the data to use when the file cannot be parsed
+        """
+        with self._lock:
+            self._sources[name] = (path, default, fallback)
+            self._entries.pop(name, None)
+
+    def get(self, name):
+        """
+        Return the current entry for a taxonomy, reloading it if the file changed
+
+        Args:
+            name (str): Registry key
+
+        Returns:
+            TaxonomyEntry: Loaded data and its version
+        """
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(name)
+            path, default, fallback = self._sources[name]
+            signature = self._signature(path)
+
+            if entry is not None and entry.signature == signature:
+                entry.checked_at = time.monotonic()
+                return entry
+
+            entry = self._load(name, path, signature, default, fallback, entry)
+            self._entries[name] = entry
+            return entry
+
+    def versions(self):
+        """Return {name: version} for every registered taxonomy"""
+        return {name: self.get(name).version for name in list(self._sources)}
+
+    def snapshot(self):
+        """Return {name: data} for every registered taxonomy (read-only)"""
+        return {name: self.get(name).data for name in list(self._sources)}
+
+    def record_build(self, name, version, error=None):
+        """
+        Record the outcome of compiling a taxonomy into its matcher
+
+        Args:
+            name (str): Registry key
+            version (str): Taxonomy version that was compiled
+            error (str): Why the compile failed, or None if it succeeded
+        """
+        with self._lock:
+            previous = self._builds.get(name, {})
+            self._builds[name] = {
+                # A failed compile leaves the previously compiled version in service
+                "version": version if error is None else previous.get("version"),
+                "error": error
+            }
+
+    def build_status(self):
+        """Return {name: {"version": version in service or None, "error": last compile error}}, without touching the files"""
+        with self._lock:
+            return {name: dict(build) for name, build in self._builds.items()}
+
+    @staticmethod
+    def _signature(path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load(self, name, path, signature, default, fallback, previous):
+        if signature is None:
+            logger.info(f"Taxonomy file {path} not found, using built-in {name} data")
+            return TaxonomyEntry(default(), "default")
+
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw)
+            version = hashlib.sha1(raw).hexdigest()[:12]
+            logger.info(f"Loaded {name} taxonomy version {version}")
+            return TaxonomyEntry(data, version, signature)
+        except Exception as e:
+            logger.error(f"Error loading {name} taxonomy: {str(e)}")
+            if previous is not None:
+                # Keep serving the last good version, but remember the bad signature
+                # so we don't re-parse the broken file on every request
+                return TaxonomyEntry(previous.data, previous.version, signature)
+            return TaxonomyEntry(fallback(), "fallback", signature)
+
+
+registry = TaxonomyRegistry()